@@ -0,0 +1,133 @@
+"""Compare linear scans with HdoRecordIndex lookups.
+
+    python benchmarks/bench_index.py [records]
+
+Needs the integration's dependencies (Home Assistant) importable.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import random
+import sys
+from time import perf_counter
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.payloads import make_casy  # noqa: E402
+from custom_components.egddistribuce.index import HdoRecordIndex  # noqa: E402
+from custom_components.egddistribuce.models import HdoRecord  # noqa: E402
+
+
+def scan_classic(records, region, code_a, code_b, code_dp):
+    """Filter as the coordinator used to (list comprehension)."""
+    return [
+        x for x in records
+        if x.get('region') == region
+        and x.get('A') == code_a
+        and x.get('B') == code_b
+        and (x.get('DP') == code_dp or x.get('DP') == '0' + code_dp)
+    ]
+
+
+def scan_hdo_codes(records, region, codes):
+    """One scan per code in the comma list."""
+    filtered = []
+    for code in codes:
+        filtered.extend(
+            x for x in records
+            if x.get('region') == region and x.get('kodHdo_A') == code
+        )
+    return filtered
+
+
+def scan_smart(records, code):
+    """Scan for kodHdo_A only."""
+    return [x for x in records if x.get('kodHdo_A') == code]
+
+
+def _best(func, number: int) -> float:
+    """Best time of 5 repeats, per call, in milliseconds."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def _best_cold(func, records) -> float:
+    """Best time of 5 repeats of func(index), each on a freshly built index.
+
+    Only the lookups are timed, not the build. A fresh index has an empty
+    memo, so the records are converted to HdoRecord like after a dataset
+    change; repeated lookups on the same index are served from the memo.
+    """
+    times = []
+    for _ in range(5):
+        index = HdoRecordIndex(records)
+        start = perf_counter()
+        func(index)
+        times.append(perf_counter() - start)
+    return min(times) * 1000
+
+
+def main(count: int = 50_000) -> None:
+    """Run the benchmark."""
+    records = make_casy(count)
+    rnd = random.Random(1)
+    sample = rnd.sample(records, 14)
+
+    classic = [(x['region'], x['A'], x['B'], x['DP']) for x in sample]
+    hdo_codes = [(x['region'], [x['kodHdo_A'], "405", "410"]) for x in sample]
+    smart = [x['kodHdo_A'] for x in sample]
+
+    build = _best(lambda: HdoRecordIndex(records), 1)
+    index = HdoRecordIndex(records)
+
+    for (region, a, b, dp) in classic:
+        assert [
+            HdoRecord.from_dict(x) for x in scan_classic(records, region, a, b, dp)
+        ] == index.classic(region, a, b, dp)
+
+    lookups = [
+        (
+            "classic",
+            lambda: [scan_classic(records, *q) for q in classic],
+            lambda idx: [idx.classic(*q) for q in classic],
+        ),
+        (
+            "hdo_codes",
+            lambda: [scan_hdo_codes(records, *q) for q in hdo_codes],
+            lambda idx: [
+                [r for code in codes for r in idx.region_code(region, code)]
+                for region, codes in hdo_codes
+            ],
+        ),
+        (
+            "smart",
+            lambda: [scan_smart(records, q) for q in smart],
+            lambda idx: [idx.code(q) for q in smart],
+        ),
+    ]
+    rows = [
+        (
+            name,
+            _best(scan, 1),
+            # První dotazy po novém stažení - bez memo
+            _best_cold(lookup, records),
+            # Další refresh téže verze - z memo
+            _best(lambda: lookup(index), 1000),
+        )
+        for name, scan, lookup in lookups
+    ]
+
+    print(f"{count} records, {len(sample)} entries per refresh")
+    print(f"index build: {build:.1f} ms (once per dataset version, not in the lookups)")
+    print(
+        f"{'filter':<10} {'scan ms':>10} {'cold ms':>10} {'warm ms':>10} {'speedup':>10}"
+    )
+    for name, scan, cold, warm in rows:
+        print(
+            f"{name:<10} {scan:>10.2f} {cold:>10.4f} {warm:>10.4f} {scan / cold:>9.1f}x"
+        )
+    print("cold: first lookups on a fresh index, warm: repeated lookups (memoized)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,257 @@
+"""Time and allocations of one coordinator refresh, stage by stage.
+
+    python benchmarks/bench_refresh.py [--records 1000 10000 100000]
+                                       [--payload casy.json] [--horizon 2]
+
+Runs the filter, schedule (_parse_times), HDO_HOURLY, remaining time and
+clock stages of EGDDistribuceCoordinator for classic, hdo_codes and smart
+entries, including TOU regions, on synthetic /casy payloads of the given
+sizes, or on a recorded one (--payload, a saved /casy response).
+
+LIMITS caps the index build and one refresh (time and peak memory) at 10k
+and 100k records; tests/test_benchmarks.py fails when a change exceeds them.
+
+Needs the integration's dependencies (Home Assistant) importable.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import timedelta
+import json
+from pathlib import Path
+import random
+import sys
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, NamedTuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.payloads import make_casy  # noqa: E402
+from custom_components.egddistribuce.const import (  # noqa: E402
+    CONFIG_TYPE_CLASSIC,
+    CONFIG_TYPE_HDO_CODES,
+    CONFIG_TYPE_SMART,
+    HOURLY_FORMAT_COMPACT,
+)
+from custom_components.egddistribuce.coordinator import (  # noqa: E402
+    EGDDistribuceCoordinator,
+)
+from custom_components.egddistribuce.daytype import DayTypeCalendar  # noqa: E402
+from custom_components.egddistribuce.index import (  # noqa: E402
+    HdoRecordIndex,
+    ValidityIndex,
+)
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+
+class Limits(NamedTuple):
+    """Upper bounds for one payload size, several times the measured values."""
+
+    build_ms: float
+    refresh_ms: float
+    peak_kib: float
+
+
+# Měřeno: 10k - stavba 33 ms, refresh max 1.7 ms / 250 KiB;
+# 100k - stavba 250 ms, refresh max 12 ms / 2.4 MiB (hdo_codes)
+LIMITS = {
+    10_000: Limits(build_ms=300, refresh_ms=20, peak_kib=1024),
+    100_000: Limits(build_ms=2500, refresh_ms=100, peak_kib=8192),
+}
+
+
+def _best(func, number: int = 1) -> float:
+    """Best time of 5 repeats, per call, in milliseconds."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def _allocations(func) -> tuple[float, int]:
+    """Peak traced memory (KiB) and number of live blocks allocated by func."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = func()  # noqa: F841 - kept alive for the snapshot
+        peak = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return peak / 1024, blocks
+
+
+def _entries(records: list[dict]) -> list[tuple[str, dict]]:
+    """Entry configurations picked from the payload, one per case."""
+    rnd = random.Random(1)
+    regular = [x for x in records if x.get("region") != "TOU"]
+    tou = [x for x in records if x.get("region") == "TOU"]
+
+    cases = []
+    if regular:
+        record = rnd.choice(regular)
+        cases.append(
+            (
+                "classic",
+                dict(
+                    config_type=CONFIG_TYPE_CLASSIC,
+                    psc=record["region"],
+                    code_a=record["A"],
+                    code_b=record["B"],
+                    code_dp=record["DP"],
+                ),
+            )
+        )
+        codes = {x["kodHdo_A"] for x in rnd.sample(regular, min(3, len(regular)))}
+        cases.append(
+            (
+                "hdo_codes",
+                dict(
+                    config_type=CONFIG_TYPE_HDO_CODES,
+                    psc=record["region"],
+                    hdo_code=", ".join(sorted(codes)),
+                ),
+            )
+        )
+    if tou:
+        record = rnd.choice(tou)
+        cases.append(
+            (
+                "classic TOU",
+                dict(
+                    config_type=CONFIG_TYPE_CLASSIC,
+                    psc=record["region"],
+                    code_a=record["A"],
+                    code_b=record["B"],
+                    code_dp=record["DP"],
+                ),
+            )
+        )
+        cases.append(
+            ("smart TOU", dict(config_type=CONFIG_TYPE_SMART, hdo_code=record["kodHdo_A"]))
+        )
+    return cases
+
+
+def measure(
+    records: list[dict], horizon: int, stages: bool = True
+) -> tuple[float, list[dict[str, Any]]]:
+    """Return the index build time and the refresh of every entry type.
+
+    With stages the filter, schedule, HDO_HOURLY, remaining time and clock
+    stages are timed too.
+    """
+    build = _best(lambda: HdoRecordIndex(records))
+    index = HdoRecordIndex(records)
+    # Stand-in for the shared dataset; PSČ is the region name itself here
+    dataset = SimpleNamespace(
+        version=1,
+        index=index,
+        calendar=DayTypeCalendar(),
+        psc_regions={x.get("region"): x.get("region") for x in records},
+    )
+
+    rows = []
+    for name, config in _entries(records):
+        coordinator = EGDDistribuceCoordinator(
+            None,
+            dataset=dataset,
+            horizon_days=horizon,
+            hourly_format=HOURLY_FORMAT_COMPACT,
+            **config,
+        )
+        if config["config_type"] == CONFIG_TYPE_CLASSIC:
+            filter_ = coordinator._filter_classic
+        elif config["config_type"] == CONFIG_TYPE_HDO_CODES:
+            filter_ = coordinator._filter_hdo_codes
+        else:
+            filter_ = coordinator._filter_smart
+
+        filtered = ValidityIndex(filter_(index))
+        now = dt_util.now()
+        today = now.date()
+
+        def schedule() -> dict:
+            coordinator._day_slots = {}
+            return coordinator._parse_times(filtered, today)
+
+        def refresh() -> dict:
+            # Nová verze datasetu: filtr + rozvrh + aktuální stav
+            coordinator._parsed_key = None
+            coordinator._filtered = None
+            coordinator._update_schedule(index)
+            return coordinator._current_state(coordinator._parsed)
+
+        peak, blocks = _allocations(refresh)
+        row = {
+            "entry": name,
+            "refresh": _best(refresh, 10),
+            "peak": peak,
+            "blocks": blocks,
+        }
+        rows.append(row)
+        if not stages:
+            continue
+
+        parsed = schedule()
+        timeline = parsed["timeline"]
+        end = timeline.start + timedelta(days=horizon)
+        row.update(
+            {
+                "filter": _best(lambda: filter_(index), 100),
+                "schedule": _best(schedule, 10),
+                "legacy": _best(lambda: coordinator._generate_hdo_hourly(timeline, end), 10),
+                "spans": _best(lambda: coordinator._generate_hdo_spans(timeline, end), 100),
+                "remain": _best(
+                    lambda: coordinator._calculate_remaining_time(timeline, now), 1000
+                ),
+                "clock": _best(lambda: coordinator._current_state(parsed), 1000),
+            }
+        )
+    return build, rows
+
+
+def bench(records: list[dict], label: str, horizon: int) -> None:
+    """Benchmark all entry types on one payload."""
+    build, rows = measure(records, horizon)
+
+    print(f"\n{label}: {len(records)} records, index build {build:.1f} ms")
+    print(
+        f"{'entry':<12} {'filter':>8} {'schedule':>9} {'legacy':>8} {'spans':>8}"
+        f" {'remain':>8} {'clock':>8} {'refresh':>9} {'peak KiB':>9} {'blocks':>7}"
+    )
+    for row in rows:
+        print(
+            f"{row['entry']:<12}"
+            f" {row['filter']:>8.3f}"
+            f" {row['schedule']:>9.3f}"
+            f" {row['legacy']:>8.3f}"
+            f" {row['spans']:>8.3f}"
+            f" {row['remain']:>8.4f}"
+            f" {row['clock']:>8.4f}"
+            f" {row['refresh']:>9.3f}"
+            f" {row['peak']:>9.1f} {row['blocks']:>7}"
+        )
+    print("times in ms per call; peak/blocks per refresh")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--records", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--payload", type=Path, help="recorded /casy response")
+    parser.add_argument("--horizon", type=int, default=2, help="days (1-14)")
+    args = parser.parse_args()
+
+    if args.payload is not None:
+        bench(json.loads(args.payload.read_text()), args.payload.name, args.horizon)
+        return
+    for count in args.records:
+        bench(make_casy(count), "synthetic", args.horizon)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Offline stand-in for hdo.distribuce24.cz with fault injection.
+
+    python benchmarks/fixture_server.py [--port 8099] [--casy casy.json]
+                                        [--region region.json] [--records 10000]
+                                        [--latency 200] [--error-rate 0.1]
+                                        [--truncate-rate 0.05] [--no-etag]
+                                        [--no-validators]
+
+Serves /casy and /region from recorded responses (--casy, --region) or from
+synthetic payloads, with ETag / Last-Modified validators answering 304 to a
+matching If-None-Match or, without it, to If-Modified-Since.
+Point the integration at it in configuration.yaml:
+
+    egddistribuce:
+      base_url: http://127.0.0.1:8099
+
+Faults: fixed plus random latency, a share of 5xx answers, a share of bodies
+cut in half (invalid JSON), --no-etag for a server sending only Last-Modified
+and --no-validators for a server without validators. POST /_bump changes the
+payloads' version (new ETag and Last-Modified, same content).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+import hashlib
+import json
+from pathlib import Path
+import random
+import sys
+import time
+
+from aiohttp import hdrs, web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.payloads import make_casy, make_region  # noqa: E402
+
+
+@dataclass
+class Faults:
+    """Faults injected into the answers."""
+
+    latency: float = 0.0  # s, added to every request
+    jitter: float = 0.0  # s, random extra latency up to this
+    error_rate: float = 0.0  # share of 503 answers
+    truncate_rate: float = 0.0  # share of bodies cut in half
+    validators: bool = True  # send ETag / Last-Modified
+    etag: bool = True  # send ETag, otherwise only Last-Modified
+    seed: int = 0
+
+
+@dataclass
+class FixtureStats:
+    """Counters of the answers sent."""
+
+    ok: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    truncated: int = 0
+
+
+@dataclass
+class _Payload:
+    body: bytes
+    etag: str = ""
+    last_modified: str = ""
+
+
+@dataclass
+class FixtureServer:
+    """aiohttp application serving the HDO API endpoints."""
+
+    casy: list
+    region: list
+    faults: Faults = field(default_factory=Faults)
+    stats: FixtureStats = field(default_factory=FixtureStats)
+
+    def __post_init__(self) -> None:
+        """Encode the payloads once."""
+        self._rnd = random.Random(self.faults.seed)
+        self._payloads: dict[str, _Payload] = {}
+        self._generation = 0
+        self._modified = 0
+        self.bump()
+
+    def bump(self) -> None:
+        """Publish the payloads again under new validators."""
+        self._generation += 1
+        # Last-Modified má rozlišení na sekundy, nová verze musí být novější
+        self._modified = max(int(time.time()), self._modified + 1)
+        last_modified = formatdate(self._modified, usegmt=True)
+        for path, data in (("/casy", self.casy), ("/region", self.region)):
+            body = json.dumps(data, ensure_ascii=False).encode()
+            digest = hashlib.sha256(body).hexdigest()[:16]
+            self._payloads[path] = _Payload(
+                body, f'"{digest}-{self._generation}"', last_modified
+            )
+
+    def make_app(self) -> web.Application:
+        """Return the web application."""
+        app = web.Application()
+        app.router.add_get("/casy", self._handle)
+        app.router.add_get("/region", self._handle)
+        app.router.add_post("/_bump", self._handle_bump)
+        return app
+
+    async def _handle_bump(self, request: web.Request) -> web.Response:
+        self.bump()
+        return web.Response(text="ok")
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        faults = self.faults
+        delay = faults.latency + self._rnd.random() * faults.jitter
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self._rnd.random() < faults.error_rate:
+            self.stats.errors += 1
+            return web.Response(status=503, text="Service Unavailable")
+
+        payload = self._payloads[request.path]
+        headers = {}
+        if faults.validators:
+            if faults.etag:
+                headers[hdrs.ETAG] = payload.etag
+            headers[hdrs.LAST_MODIFIED] = payload.last_modified
+            if self._not_modified(request, payload):
+                self.stats.not_modified += 1
+                return web.Response(status=304, headers=headers)
+
+        body = payload.body
+        if self._rnd.random() < faults.truncate_rate:
+            self.stats.truncated += 1
+            body = body[: len(body) // 2]
+        self.stats.ok += 1
+        return web.Response(
+            body=body, headers=headers, content_type="application/json"
+        )
+
+    def _not_modified(self, request: web.Request, payload: _Payload) -> bool:
+        # If-None-Match má přednost, If-Modified-Since platí jen bez něj
+        etag = request.headers.get(hdrs.IF_NONE_MATCH)
+        if etag is not None:
+            return self.faults.etag and etag == payload.etag
+        since = request.headers.get(hdrs.IF_MODIFIED_SINCE)
+        if since is None:
+            return False
+        try:
+            return parsedate_to_datetime(since) >= parsedate_to_datetime(
+                payload.last_modified
+            )
+        except (TypeError, ValueError):
+            return False
+
+
+async def start_server(
+    server: FixtureServer, host: str = "127.0.0.1", port: int = 0
+) -> tuple[web.AppRunner, str]:
+    """Start the server, return (runner, base URL)."""
+    runner = web.AppRunner(server.make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://{host}:{port}"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the payload and fault options."""
+    parser.add_argument("--casy", type=Path, help="recorded /casy response")
+    parser.add_argument("--region", type=Path, help="recorded /region response")
+    parser.add_argument("--records", type=int, default=10_000, help="synthetic /casy size")
+    parser.add_argument("--latency", type=float, default=0, help="ms")
+    parser.add_argument("--jitter", type=float, default=0, help="ms, random extra")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of 503")
+    parser.add_argument("--truncate-rate", type=float, default=0, help="share of cut bodies")
+    parser.add_argument("--no-etag", action="store_true", help="only Last-Modified")
+    parser.add_argument("--no-validators", action="store_true", help="no validators, no 304")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def server_from_args(args: argparse.Namespace) -> FixtureServer:
+    """Build the server from the parsed options."""
+    casy = (
+        json.loads(args.casy.read_text())
+        if args.casy
+        else make_casy(args.records, args.seed)
+    )
+    region = (
+        json.loads(args.region.read_text())
+        if args.region
+        else make_region(seed=args.seed)
+    )
+    faults = Faults(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        truncate_rate=args.truncate_rate,
+        validators=not args.no_validators,
+        etag=not args.no_etag,
+        seed=args.seed,
+    )
+    return FixtureServer(casy, region, faults)
+
+
+def main() -> None:
+    """Run the server until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args)
+    print(f"Serving {len(server.casy)} /casy records on http://{args.host}:{args.port}")
+    web.run_app(server.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
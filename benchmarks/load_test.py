@@ -0,0 +1,128 @@
+"""Many installations polling the offline fixture server at once.
+
+    python benchmarks/load_test.py [--clients 200] [--rounds 5]
+                                   [--bump-every 2] [fixture server options]
+
+Starts benchmarks/fixture_server.py in-process and runs --clients dataset
+refreshes concurrently per round: /casy and /region through
+EGDDistribuceApi (conditional requests, one session per installation), and
+the record index rebuilt whenever /casy changed, as the shared dataset does.
+Every --bump-every rounds the server publishes new validators. No network
+and no Home Assistant instance are needed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+import json
+from pathlib import Path
+import statistics
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.fixture_server import (  # noqa: E402
+    add_arguments,
+    server_from_args,
+    start_server,
+)
+from custom_components.egddistribuce.api import EGDDistribuceApi  # noqa: E402
+from custom_components.egddistribuce.const import (  # noqa: E402
+    API_HDO_PATH,
+    API_REGION_PATH,
+)
+from custom_components.egddistribuce.index import HdoRecordIndex  # noqa: E402
+
+
+async def _refresh(api: EGDDistribuceApi, base_url: str) -> str:
+    """One dataset refresh, return its outcome."""
+    try:
+        records, changed = await api.async_get_json(f"{base_url}{API_HDO_PATH}")
+        await api.async_get_json(f"{base_url}{API_REGION_PATH}")
+    except aiohttp.ClientResponseError as err:
+        return f"http {err.status}"
+    except json.JSONDecodeError:
+        return "invalid json"
+    except aiohttp.ClientError as err:
+        return type(err).__name__
+    if changed:
+        HdoRecordIndex(records)
+        return "changed"
+    return "unchanged"
+
+
+def _percentile(values: list[float], share: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the load test."""
+    server = server_from_args(args)
+    runner, base_url = await start_server(server)
+    connector_limit = args.connections
+    sessions = [
+        aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=connector_limit)
+        )
+        for _ in range(args.clients)
+    ]
+    clients = [EGDDistribuceApi(session) for session in sessions]
+    print(
+        f"{args.clients} clients, {len(server.casy)} /casy records, {base_url}"
+    )
+    print(
+        f"{'round':>5} {'wall s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        f" {'max ms':>8}  outcomes"
+    )
+
+    async def timed(api: EGDDistribuceApi) -> tuple[float, str]:
+        start = time.perf_counter()
+        outcome = await _refresh(api, base_url)
+        return (time.perf_counter() - start) * 1000, outcome
+
+    try:
+        for round_ in range(1, args.rounds + 1):
+            if args.bump_every and round_ > 1 and (round_ - 1) % args.bump_every == 0:
+                server.bump()
+            start = time.perf_counter()
+            results = await asyncio.gather(*(timed(api) for api in clients))
+            wall = time.perf_counter() - start
+            latencies = sorted(x[0] for x in results)
+            outcomes = Counter(x[1] for x in results)
+            print(
+                f"{round_:>5} {wall:>8.2f}"
+                f" {statistics.median(latencies):>8.1f}"
+                f" {_percentile(latencies, 0.95):>8.1f}"
+                f" {_percentile(latencies, 0.99):>8.1f}"
+                f" {latencies[-1]:>8.1f}  "
+                + ", ".join(f"{k} {v}" for k, v in sorted(outcomes.items()))
+            )
+    finally:
+        for session in sessions:
+            await session.close()
+        await runner.cleanup()
+
+    stats = server.stats
+    print(
+        f"server: 200 {stats.ok}, 304 {stats.not_modified},"
+        f" 503 {stats.errors}, truncated {stats.truncated}"
+    )
+
+
+def main() -> None:
+    """Parse the options and run."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--bump-every", type=int, default=2, help="rounds, 0 = never")
+    parser.add_argument("--connections", type=int, default=1, help="per client")
+    add_arguments(parser)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
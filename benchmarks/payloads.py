@@ -0,0 +1,84 @@
+"""Synthetic /casy and /region payloads for the benchmarks.
+
+The records have the same shape as https://hdo.distribuce24.cz/casy, only
+with random codes, regions and time slots.
+"""
+from __future__ import annotations
+
+import random
+
+REGIONS = [
+    "Brno",
+    "Jihlava",
+    "Znojmo",
+    "Hodonin",
+    "Zlin",
+    "Trebic",
+    "Tabor",
+    "Pisek",
+    "Ceske Budejovice",
+    "TOU",
+]
+
+
+def _slots(rnd: random.Random) -> list[dict[str, str]]:
+    """2-4 non-overlapping slots within a day."""
+    hours = sorted(rnd.sample(range(0, 24), rnd.randint(2, 4) * 2))
+    slots = []
+    for start, end in zip(hours[::2], hours[1::2]):
+        slots.append({"od": f"{start:02d}:00:00", "do": f"{end - 1:02d}:59:00"})
+    if rnd.random() < 0.2:
+        slots[-1]["do"] = "23:59:00"
+    return slots
+
+
+def _validity(rnd: random.Random) -> tuple[dict, dict]:
+    """Either a recurring season (rok 9999) or a dated window."""
+    if rnd.random() < 0.5:
+        od_month, do_month = rnd.choice([(1, 12), (4, 9), (10, 3)])
+        return (
+            {"rok": 9999, "mesic": od_month, "den": 1},
+            {"rok": 9999, "mesic": do_month, "den": 28},
+        )
+    year = rnd.choice([2024, 2025, 2026])
+    return (
+        {"rok": year, "mesic": 1, "den": 1},
+        {"rok": year, "mesic": 12, "den": 31},
+    )
+
+
+def make_record(rnd: random.Random) -> dict:
+    """One random HDO record."""
+    region = rnd.choice(REGIONS)
+    od, do = _validity(rnd)
+    if rnd.random() < 0.3:
+        # Stejné časy pro všechny dny
+        slots = _slots(rnd)
+        days = [{"denVTydnu": day, "casy": slots} for day in range(1, 8)]
+    else:
+        days = [{"denVTydnu": day, "casy": _slots(rnd)} for day in range(1, 8)]
+    return {
+        "region": region,
+        "A": str(rnd.randint(1, 9)),
+        "B": str(rnd.randint(1, 9)),
+        "DP": f"{rnd.randint(1, 16):02d}",
+        "kodHdo_A": f"Cd{rnd.randint(1, 99)}" if region == "TOU" else str(rnd.randint(400, 420)),
+        "od": od,
+        "do": do,
+        "sazby": [{"dny": days}],
+    }
+
+
+def make_casy(count: int, seed: int = 0) -> list[dict]:
+    """Synthetic /casy payload with `count` records."""
+    rnd = random.Random(seed)
+    return [make_record(rnd) for _ in range(count)]
+
+
+def make_region(count: int = 2000, seed: int = 0) -> list[dict]:
+    """Synthetic /region payload (PSČ -> region)."""
+    rnd = random.Random(seed)
+    return [
+        {"PSC": f"{psc:05d}", "Region": rnd.choice(REGIONS[:-1])}
+        for psc in rnd.sample(range(10000, 79999), count)
+    ]
@@ -8,10 +8,18 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
 from homeassistant.components.http import StaticPathConfig
 
 from .const import (
     DOMAIN,
+    API_BASE_URL,
+    DATA_BASE_URL,
+    DATA_FILTER_RECORDS,
+    DATA_DATASET,
+    CONF_BASE_URL,
+    CONF_FILTER_RECORDS,
     CONF_PSC,
     CONF_CODE_A,
     CONF_CODE_B,
@@ -21,6 +29,9 @@ from .const import (
     CONF_PRICE_VT,
     CONF_CONFIG_TYPE,
     CONF_UPDATE_INTERVAL,
+    CONF_REGION_UPDATE_INTERVAL,
+    CONF_HOURLY_FORMAT,
+    CONF_HORIZON_DAYS,
     CONF_COLOR_VT,
     CONF_COLOR_NT,
     CONFIG_TYPE_CLASSIC,
@@ -29,18 +40,53 @@ from .const import (
     DEFAULT_PRICE_NT,
     DEFAULT_PRICE_VT,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_REGION_UPDATE_INTERVAL,
+    DEFAULT_HOURLY_FORMAT,
+    DEFAULT_HORIZON_DAYS,
     DEFAULT_COLOR_VT,
     DEFAULT_COLOR_NT,
 )
 from .coordinator import EGDDistribuceCoordinator
+from .dataset import async_get_dataset
+from .energy import async_remove_energy_totals
+from .services import async_setup_services
+from .websocket import async_setup_websocket
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
 
+# Optional configuration.yaml section - entries themselves come from the UI
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema(
+            {
+                vol.Optional(CONF_BASE_URL, default=API_BASE_URL): cv.url,
+                vol.Optional(CONF_FILTER_RECORDS, default=True): cv.boolean,
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the EGD Distribuce component."""
+    # API base URL, e.g. the offline fixture server from benchmarks/
+    base_url = config.get(DOMAIN, {}).get(CONF_BASE_URL, API_BASE_URL)
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    domain_data[DATA_BASE_URL] = base_url
+    # Keep only the records of the configured entries (streamed /casy decode)
+    domain_data[DATA_FILTER_RECORDS] = config.get(DOMAIN, {}).get(
+        CONF_FILTER_RECORDS, True
+    )
+    if base_url != API_BASE_URL:
+        _LOGGER.warning("Using HDO API at %s", base_url)
+
+    # Schedule for the HDO chart card (fetched on demand, not in attributes)
+    async_setup_websocket(hass)
+    async_setup_services(hass)
+
     # Register custom Lovelace card
     await hass.http.async_register_static_paths([
         StaticPathConfig(
@@ -75,6 +121,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         CONF_UPDATE_INTERVAL,
         entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
     )
+    region_update_interval = entry.options.get(
+        CONF_REGION_UPDATE_INTERVAL,
+        entry.data.get(CONF_REGION_UPDATE_INTERVAL, DEFAULT_REGION_UPDATE_INTERVAL)
+    )
+    hourly_format = entry.options.get(
+        CONF_HOURLY_FORMAT,
+        entry.data.get(CONF_HOURLY_FORMAT, DEFAULT_HOURLY_FORMAT)
+    )
+    horizon_days = entry.options.get(
+        CONF_HORIZON_DAYS,
+        entry.data.get(CONF_HORIZON_DAYS, DEFAULT_HORIZON_DAYS)
+    )
     color_vt = entry.options.get(
         CONF_COLOR_VT,
         entry.data.get(CONF_COLOR_VT, DEFAULT_COLOR_VT)
@@ -91,9 +149,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     code_dp = entry.data.get(CONF_CODE_DP)
     hdo_code = entry.data.get(CONF_HDO_CODE)
 
+    # Shared HDO dataset (one download for all entries), started from the
+    # last snapshot so setup does not wait for the API
+    dataset = async_get_dataset(hass)
+    await dataset.async_load_snapshot()
+
     # Create coordinator
     coordinator = EGDDistribuceCoordinator(
         hass,
+        dataset=dataset,
         config_type=config_type,
         psc=psc,
         code_a=code_a,
@@ -105,14 +169,37 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         update_interval=int(update_interval),
         color_vt=str(color_vt),
         color_nt=str(color_nt),
+        hourly_format=hourly_format,
+        horizon_days=int(horizon_days),
+    )
+
+    # Register with the shared dataset before the first download, so the
+    # records this entry uses are kept (smart meters: by code in any region)
+    smart = config_type == CONFIG_TYPE_SMART
+    dataset.async_register_entry(
+        entry.entry_id,
+        int(region_update_interval),
+        psc=None if smart else psc,
+        hdo_code=hdo_code if smart else None,
     )
 
     # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except ConfigEntryNotReady:
+        dataset.async_unregister_entry(entry.entry_id)
+        raise
+    entry.async_on_unload(coordinator.async_shutdown)
+
+    # Local clock: recompute state every update_interval and at each tariff change
+    entry.async_on_unload(coordinator.async_start_clock())
 
     # Store coordinator
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    # Subscribe to the shared dataset
+    entry.async_on_unload(dataset.async_add_listener(coordinator.async_dataset_updated))
+
     # Setup platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -127,9 +214,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
 
+        if hass.data[DOMAIN][DATA_DATASET].async_unregister_entry(entry.entry_id):
+            await hass.data[DOMAIN].pop(DATA_DATASET).async_shutdown()
+
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored energy totals of a deleted entry."""
+    await async_remove_energy_totals(hass, entry.entry_id)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry when options are updated."""
     await hass.config_entries.async_reload(entry.entry_id)
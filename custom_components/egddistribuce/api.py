@@ -0,0 +1,288 @@
+"""HTTP client for the EGD Distribuce HDO API."""
+from __future__ import annotations
+
+import codecs
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+from time import perf_counter
+from typing import Any
+
+import aiohttp
+from aiohttp import hdrs
+
+from .timing import StageTimings
+
+_LOGGER = logging.getLogger(__name__)
+
+# Size of the body chunks decoded while streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class ConnectionStats:
+    """Counters of HTTP requests and pooled connection usage."""
+
+    requests: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    bytes_received: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return a TraceConfig updating these counters for a session."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        return trace_config
+
+    async def _on_request_start(self, *_: Any) -> None:
+        self.requests += 1
+
+    async def _on_connection_create_end(self, *_: Any) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, *_: Any) -> None:
+        self.connections_reused += 1
+
+
+@dataclass
+class PayloadStats:
+    """Size of the last body of an endpoint and the records decoded from it."""
+
+    bytes: int = 0
+    records: int = 0
+    kept: int = 0
+
+
+@dataclass
+class CachedPayload:
+    """Last decoded body of an endpoint together with its validators."""
+
+    data: Any
+    digest: str
+    etag: str | None = None
+    last_modified: str | None = None
+    # Filter the records were selected by while streaming (None = all)
+    record_filter: Hashable | None = None
+
+
+class JsonArrayStream:
+    """Decode a JSON array incrementally, one element at a time.
+
+    Chunks of the body are fed as they arrive; each complete element is
+    decoded with raw_decode and either kept or dropped right away, so only
+    the kept elements and one partial element are ever held in memory.
+    An element counts as complete only once the ',' or ']' after it has
+    arrived, so numbers split across chunks are never cut short. A comma
+    must follow an element and be followed by one, so "[1,]", "[,1]" or
+    "[1,,2]" from a cut or corrupt body raise instead of being cached.
+    """
+
+    def __init__(self, keep: Callable[[Any], bool] | None = None) -> None:
+        """Initialize the decoder, keeping the elements `keep` accepts."""
+        self.keep = keep
+        self.items: list = []
+        self.seen = 0
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        # Poslední token: "[" (začátek), "," nebo "value"
+        self._last = "["
+
+    def feed(self, chunk: bytes) -> None:
+        """Decode the complete elements in the chunk."""
+        self._buffer += self._text.decode(chunk)
+        self._decode(final=False)
+
+    def close(self) -> list:
+        """Finish decoding, return the kept elements."""
+        self._buffer += self._text.decode(b"", final=True)
+        self._decode(final=True)
+        if not self._finished:
+            raise json.JSONDecodeError("Unterminated array", self._buffer, 0)
+        return self.items
+
+    def _decode(self, final: bool) -> None:
+        buffer = self._buffer
+        pos = _skip_whitespace(buffer, 0)
+        if not self._started:
+            if pos == len(buffer):
+                self._buffer = ""
+                return
+            if buffer[pos] != "[":
+                raise json.JSONDecodeError("Expecting '['", buffer, pos)
+            self._started = True
+            pos = _skip_whitespace(buffer, pos + 1)
+
+        while pos < len(buffer) and not self._finished:
+            if buffer[pos] == "]":
+                if self._last == ",":
+                    raise json.JSONDecodeError("Expecting value", buffer, pos)
+                self._finished = True
+                pos += 1
+                break
+            if buffer[pos] == ",":
+                if self._last != "value":
+                    raise json.JSONDecodeError("Expecting value", buffer, pos)
+                self._last = ","
+                pos = _skip_whitespace(buffer, pos + 1)
+                continue
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # Neúplný prvek - počkat na další data
+            # Prvek platí až s oddělovačem za ním - číslo ("2.", "-3e")
+            # může pokračovat v dalším chunku
+            after = _skip_whitespace(buffer, end)
+            if after == len(buffer) or buffer[after] not in ",]":
+                if final:
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, after)
+                break
+            self._last = "value"
+            self.seen += 1
+            if self.keep is None or self.keep(item):
+                self.items.append(item)
+            pos = after
+
+        if self._finished and _skip_whitespace(buffer, pos) != len(buffer):
+            raise json.JSONDecodeError("Extra data", buffer, pos)
+        self._buffer = buffer[pos:]
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    """Return the position of the first non-whitespace character from pos."""
+    while pos < len(text) and text[pos] in " \t\n\r":
+        pos += 1
+    return pos
+
+
+class EGDDistribuceApi:
+    """Fetch JSON endpoints with conditional requests.
+
+    The HDO schedule changes only a few times a year, so the last body is kept
+    per URL and re-validated with If-None-Match / If-Modified-Since. When the
+    server answers 304, or sends the very same body again (checked by hash for
+    servers without validators), the cached data is returned without decoding.
+    A streamed body is decoded while it arrives only when the cached payload
+    has validators; otherwise it is hashed first and decoded on a mismatch.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        stats: ConnectionStats | None = None,
+        timings: StageTimings | None = None,
+    ) -> None:
+        """Initialize the client on a (pooled) session."""
+        self.session = session
+        self.stats = stats or ConnectionStats()
+        # Doba dekódování JSON ("decode_casy", ...) a velikosti posledních odpovědí
+        self.timings = timings or StageTimings()
+        self.payload_stats: dict[str, PayloadStats] = {}
+        self._cache: dict[str, CachedPayload] = {}
+
+    def get_cached(self, url: str) -> CachedPayload | None:
+        """Return the cached payload of the URL, if any."""
+        return self._cache.get(url)
+
+    def set_cached(self, url: str, payload: CachedPayload) -> None:
+        """Seed the cache, e.g. from a snapshot saved on disk."""
+        self._cache[url] = payload
+
+    async def async_get_json(
+        self,
+        url: str,
+        record_filter: Callable[[Any], bool] | None = None,
+    ) -> tuple[Any, bool]:
+        """Return (data, changed) for the given URL.
+
+        With a record filter the body must be a JSON array; it is decoded
+        while it streams in and only the accepted elements are kept. The
+        filter must be hashable: a cached body selected by a different
+        filter is downloaded again.
+        """
+        cached = self._cache.get(url)
+        if cached is not None and cached.record_filter != record_filter:
+            cached = None
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers[hdrs.IF_NONE_MATCH] = cached.etag
+            if cached.last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = cached.last_modified
+
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                _LOGGER.debug("%s not modified (304)", url)
+                self.stats.not_modified += 1
+                return cached.data, False
+
+            response.raise_for_status()
+            etag = response.headers.get(hdrs.ETAG)
+            last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+            decode_time = 0.0
+            if record_filter is None:
+                body = await response.read()
+                size = len(body)
+                digest = hashlib.sha256(body).hexdigest()
+            else:
+                # Hash a dekódování po částech - celé tělo se v paměti nedrží
+                sha = hashlib.sha256()
+                stream = JsonArrayStream(record_filter)
+                # Server bez validátorů posílá i nezměněná data - dekódovat až
+                # když hash ukáže změnu
+                pending: list[bytes] | None = (
+                    []
+                    if cached is not None and not (cached.etag or cached.last_modified)
+                    else None
+                )
+                size = 0
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    size += len(chunk)
+                    sha.update(chunk)
+                    if pending is not None:
+                        pending.append(chunk)
+                        continue
+                    start = perf_counter()
+                    stream.feed(chunk)
+                    decode_time += perf_counter() - start
+                digest = sha.hexdigest()
+
+        self.stats.bytes_received += size
+        payload_stats = self.payload_stats.setdefault(url, PayloadStats())
+        payload_stats.bytes = size
+
+        if cached is not None and cached.digest == digest:
+            _LOGGER.debug("%s unchanged (same content hash)", url)
+            self.stats.unchanged += 1
+            cached.etag = etag
+            cached.last_modified = last_modified
+            return cached.data, False
+
+        start = perf_counter()
+        if record_filter is None:
+            data = json.loads(body)
+        else:
+            for chunk in pending or ():
+                stream.feed(chunk)
+            data = stream.close()
+            _LOGGER.debug("%s: kept %s of %s records", url, len(data), stream.seen)
+        self.timings.record(
+            f"decode_{url.rsplit('/', 1)[-1]}", decode_time + perf_counter() - start
+        )
+        if isinstance(data, list):
+            payload_stats.records = len(data) if record_filter is None else stream.seen
+            payload_stats.kept = len(data)
+        self._cache[url] = CachedPayload(
+            data, digest, etag, last_modified, record_filter
+        )
+        return data, True
@@ -1,135 +1,100 @@
-"""The EGD Distribuce integration."""
-from __future__ import annotations
-
-import logging
-import os
-
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.components.http import StaticPathConfig
-
-from .const import (
-    DOMAIN,
-    CONF_PSC,
-    CONF_CODE_A,
-    CONF_CODE_B,
-    CONF_CODE_DP,
-    CONF_HDO_CODE,
-    CONF_PRICE_NT,
-    CONF_PRICE_VT,
-    CONF_CONFIG_TYPE,
-    CONF_UPDATE_INTERVAL,
-    CONF_COLOR_VT,
-    CONF_COLOR_NT,
-    CONFIG_TYPE_CLASSIC,
-    CONFIG_TYPE_HDO_CODES,
-    CONFIG_TYPE_SMART,
-    DEFAULT_PRICE_NT,
-    DEFAULT_PRICE_VT,
-    DEFAULT_UPDATE_INTERVAL,
-    DEFAULT_COLOR_VT,
-    DEFAULT_COLOR_NT,
-)
-from .coordinator import EGDDistribuceCoordinator
-
-_LOGGER = logging.getLogger(__name__)
-
-PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
-
-
-async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Set up the EGD Distribuce component."""
-    # Register custom Lovelace card
-    await hass.http.async_register_static_paths([
-        StaticPathConfig(
-            url_path="/egddistribuce_card/hdo-chart-card.js",
-            path=hass.config.path(f"custom_components/{DOMAIN}/hdo_chart_card.js"),
-            cache_headers=True,
-        )
-    ])
-    
-    _LOGGER.info("Registered HDO Chart Card at /egddistribuce_card/hdo-chart-card.js")
-    
-    return True
-
-
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up EGD Distribuce from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
-
-    # Get configuration type
-    config_type = entry.data.get(CONF_CONFIG_TYPE, CONFIG_TYPE_CLASSIC)
-    
-    # Get common config
-    price_nt = entry.options.get(
-        CONF_PRICE_NT,
-        entry.data.get(CONF_PRICE_NT, DEFAULT_PRICE_NT)
-    )
-    price_vt = entry.options.get(
-        CONF_PRICE_VT,
-        entry.data.get(CONF_PRICE_VT, DEFAULT_PRICE_VT)
-    )
-    update_interval = entry.options.get(
-        CONF_UPDATE_INTERVAL,
-        entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
-    )
-    color_vt = entry.options.get(
-        CONF_COLOR_VT,
-        entry.data.get(CONF_COLOR_VT, DEFAULT_COLOR_VT)
-    )
-    color_nt = entry.options.get(
-        CONF_COLOR_NT,
-        entry.data.get(CONF_COLOR_NT, DEFAULT_COLOR_NT)
-    )
-
-    # Get type-specific config
-    psc = entry.data.get(CONF_PSC)
-    code_a = entry.data.get(CONF_CODE_A)
-    code_b = entry.data.get(CONF_CODE_B)
-    code_dp = entry.data.get(CONF_CODE_DP)
-    hdo_code = entry.data.get(CONF_HDO_CODE)
-
-    # Create coordinator
-    coordinator = EGDDistribuceCoordinator(
-        hass,
-        config_type=config_type,
-        psc=psc,
-        code_a=code_a,
-        code_b=code_b,
-        code_dp=code_dp,
-        hdo_code=hdo_code,
-        price_nt=float(price_nt),
-        price_vt=float(price_vt),
-        update_interval=int(update_interval),
-        color_vt=str(color_vt),
-        color_nt=str(color_nt),
-    )
-
-    # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
-
-    # Store coordinator
-    hass.data[DOMAIN][entry.entry_id] = coordinator
-
-    # Setup platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-
-    # Setup options update listener
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
-
-    return True
-
-
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
-
-    return unload_ok
-
-
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry when options are updated."""
-    await hass.config_entries.async_reload(entry.entry_id)
+"""Binary sensor platform for EGD Distribuce."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import EGDDistribuceCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up EGD Distribuce binary sensors from a config entry."""
+    coordinator: EGDDistribuceCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities([EGDDistribuceHdoStatusSensor(coordinator, entry)])
+
+
+class EGDDistribuceHdoStatusSensor(CoordinatorEntity[EGDDistribuceCoordinator], BinarySensorEntity):
+    """On while the low tariff (NT / HDO signal) is active.
+
+    The state is derived from the cached schedule by the coordinator clock,
+    which ticks exactly at every tariff transition - no polling.
+    """
+
+    _attr_has_entity_name = True
+    # Data pro HDO kartu - velká nebo se mění každou minutu, neukládat do historie
+    _unrecorded_attributes = frozenset(
+        {
+            "HDO_HOURLY",
+            "hdo_times_today_raw",
+            "hdo_times_tomorrow_raw",
+            "schedule_version",
+        }
+    )
+
+    def __init__(
+        self,
+        coordinator: EGDDistribuceCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(coordinator)
+
+        self._attr_unique_id = f"{entry.entry_id}_hdo_status"
+        self._attr_name = "HDO status"
+
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": entry.title,
+            "manufacturer": "EGD Distribuce",
+            "model": "HDO",
+            "entry_type": "service",
+        }
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the low tariff is active."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data.get("is_active", False)
+
+    @property
+    def icon(self) -> str:
+        """Return the icon to use in the frontend."""
+        return "mdi:flash" if self.is_on else "mdi:flash-off"
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes (also used by the HDO chart card)."""
+        if self.coordinator.data is None:
+            return {}
+
+        data = self.coordinator.data
+        attributes = {
+            "current_price": data.get("current_price"),
+            "region": data.get("region"),
+            "price_nt": self.coordinator.price_nt,
+            "price_vt": self.coordinator.price_vt,
+            "color_nt": self.coordinator.color_nt,
+            "color_vt": self.coordinator.color_vt,
+            "hdo_times_today_raw": data.get("hdo_times_today", []),
+            "hdo_times_tomorrow_raw": data.get("hdo_times_tomorrow", []),
+            # HDO karta si podle verze stáhne rozvrh přes websocket
+            "schedule_version": self.coordinator.schedule_version,
+        }
+        if (hdo_hourly := data.get("HDO_HOURLY")) is not None:
+            attributes["HDO_HOURLY"] = hdo_hourly
+        return attributes
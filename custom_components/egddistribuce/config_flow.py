@@ -6,12 +6,15 @@ from typing import Any
 
 import voluptuous as vol
 import aiohttp
+import async_timeout
 
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.components.sensor import SensorDeviceClass
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers import selector
 
 from .const import (
     DOMAIN,
@@ -24,6 +27,10 @@ from .const import (
     CONF_PRICE_VT,
     CONF_CONFIG_TYPE,
     CONF_UPDATE_INTERVAL,
+    CONF_REGION_UPDATE_INTERVAL,
+    CONF_HOURLY_FORMAT,
+    CONF_HORIZON_DAYS,
+    CONF_ENERGY_ENTITY,
     CONF_COLOR_VT,
     CONF_COLOR_NT,
     CONFIG_TYPE_CLASSIC,
@@ -32,14 +39,20 @@ from .const import (
     DEFAULT_PRICE_NT,
     DEFAULT_PRICE_VT,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_REGION_UPDATE_INTERVAL,
+    DEFAULT_HOURLY_FORMAT,
+    DEFAULT_HORIZON_DAYS,
+    MAX_HORIZON_DAYS,
+    HOURLY_FORMAT_COMPACT,
+    HOURLY_FORMAT_LEGACY,
+    HOURLY_FORMAT_DISABLED,
     DEFAULT_COLOR_VT,
     DEFAULT_COLOR_NT,
 )
+from .dataset import async_get_dataset
 
 _LOGGER = logging.getLogger(__name__)
 
-API_REGION_URL = "https://hdo.distribuce24.cz/region"
-
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input."""
@@ -51,18 +64,12 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
 
     psc = data[CONF_PSC]
 
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(API_REGION_URL, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status != 200:
-                    raise CannotConnect
-
-                regions_data = await response.json()
-                matching_regions = [x for x in regions_data if x.get("PSC") == psc]
-
-                if not matching_regions:
-                    raise InvalidPSC
+    # Tabulka PSČ ze sdíleného datasetu (stahuje se jen když je potřeba)
+    dataset = async_get_dataset(hass)
 
+    try:
+        async with async_timeout.timeout(10):
+            psc_regions = await dataset.async_get_psc_regions()
     except aiohttp.ClientError as err:
         _LOGGER.error("Error connecting to EGD API: %s", err)
         raise CannotConnect from err
@@ -70,6 +77,9 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
         _LOGGER.exception("Unexpected exception: %s", err)
         raise CannotConnect from err
 
+    if psc not in psc_regions:
+        raise InvalidPSC
+
     if config_type == CONFIG_TYPE_CLASSIC:
         title = f"EGD HDO {psc} A{data.get(CONF_CODE_A)}B{data.get(CONF_CODE_B)}P{data.get(CONF_CODE_DP)}"
     else:
@@ -79,6 +89,15 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     return {"title": title}
 
 
+def _new_entry_data(user_input: dict[str, Any]) -> dict[str, Any]:
+    """Return the data of a new entry.
+
+    The chart card reads the schedule over the websocket, so new entries
+    start without the HDO_HOURLY attribute; it can be enabled in the options.
+    """
+    return {**user_input, CONF_HOURLY_FORMAT: HOURLY_FORMAT_DISABLED}
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for EGD Distribuce."""
 
@@ -138,7 +157,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(unique_id)
                 self._abort_if_unique_id_configured()
 
-                return self.async_create_entry(title=info["title"], data=user_input)
+                return self.async_create_entry(
+                    title=info["title"], data=_new_entry_data(user_input)
+                )
 
         code_a_options = {str(i): str(i) for i in range(1, 10)}
         code_b_options = {str(i): str(i) for i in range(1, 10)}
@@ -185,7 +206,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(unique_id)
                 self._abort_if_unique_id_configured()
 
-                return self.async_create_entry(title=info["title"], data=user_input)
+                return self.async_create_entry(
+                    title=info["title"], data=_new_entry_data(user_input)
+                )
 
         return self.async_show_form(
             step_id="hdo_codes",
@@ -224,7 +247,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(unique_id)
                 self._abort_if_unique_id_configured()
 
-                return self.async_create_entry(title=info["title"], data=user_input)
+                return self.async_create_entry(
+                    title=info["title"], data=_new_entry_data(user_input)
+                )
 
         return self.async_show_form(
             step_id="smart",
@@ -277,6 +302,20 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         current_color_nt = self._config_entry.options.get(
             CONF_COLOR_NT, self._config_entry.data.get(CONF_COLOR_NT, DEFAULT_COLOR_NT)
         )
+        current_region_update_interval = self._config_entry.options.get(
+            CONF_REGION_UPDATE_INTERVAL,
+            self._config_entry.data.get(
+                CONF_REGION_UPDATE_INTERVAL, DEFAULT_REGION_UPDATE_INTERVAL
+            ),
+        )
+        current_hourly_format = self._config_entry.options.get(
+            CONF_HOURLY_FORMAT,
+            self._config_entry.data.get(CONF_HOURLY_FORMAT, DEFAULT_HOURLY_FORMAT),
+        )
+        current_horizon_days = self._config_entry.options.get(
+            CONF_HORIZON_DAYS,
+            self._config_entry.data.get(CONF_HORIZON_DAYS, DEFAULT_HORIZON_DAYS),
+        )
 
         return self.async_show_form(
             step_id="init",
@@ -286,6 +325,39 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Optional(CONF_PRICE_NT, default=current_price_nt): cv.positive_float,
                     vol.Optional(CONF_COLOR_VT, default=current_color_vt): cv.string,
                     vol.Optional(CONF_COLOR_NT, default=current_color_nt): cv.string,
+                    vol.Optional(
+                        CONF_REGION_UPDATE_INTERVAL,
+                        default=current_region_update_interval,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=168)),
+                    vol.Optional(
+                        CONF_HOURLY_FORMAT, default=current_hourly_format
+                    ): vol.In(
+                        {
+                            HOURLY_FORMAT_COMPACT: "Kompaktní (úseky NT/VT)",
+                            HOURLY_FORMAT_LEGACY: "Původní (ceny po 15 minutách)",
+                            HOURLY_FORMAT_DISABLED: "Vypnuto",
+                        }
+                    ),
+                    vol.Optional(
+                        CONF_HORIZON_DAYS, default=current_horizon_days
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_HORIZON_DAYS)),
+                    # Nepovinné - prázdné pole senzory spotřeby vypne
+                    vol.Optional(
+                        CONF_ENERGY_ENTITY,
+                        description={
+                            "suggested_value": self._config_entry.options.get(
+                                CONF_ENERGY_ENTITY
+                            )
+                        },
+                    ): selector.EntitySelector(
+                        selector.EntitySelectorConfig(
+                            domain="sensor",
+                            device_class=[
+                                SensorDeviceClass.POWER,
+                                SensorDeviceClass.ENERGY,
+                            ],
+                        )
+                    ),
                 }
             ),
         )
@@ -2,7 +2,27 @@
 
 DOMAIN = "egddistribuce"
 
+# API endpoints (the base URL can be changed in configuration.yaml)
+API_BASE_URL = "https://hdo.distribuce24.cz"
+API_REGION_PATH = "/region"
+API_HDO_PATH = "/casy"
+
+# Keys in hass.data[DOMAIN] shared by all config entries
+DATA_DATASET = "dataset"
+DATA_BASE_URL = "base_url"
+DATA_FILTER_RECORDS = "filter_records"
+
+# Snapshot of the last good API payloads (.storage)
+STORAGE_KEY = f"{DOMAIN}.dataset"
+STORAGE_VERSION = 1
+# NT/VT energy and cost totals of one entry (.storage)
+ENERGY_STORAGE_KEY = f"{DOMAIN}.energy"
+ENERGY_STORAGE_VERSION = 1
+ENERGY_SAVE_DELAY = 60  # seconds, totals are written at most this often
+
 # Configuration keys
+CONF_BASE_URL = "base_url"  # configuration.yaml only (e.g. a local test server)
+CONF_FILTER_RECORDS = "filter_records"  # configuration.yaml only, keep only used records
 CONF_PSC = "psc"
 CONF_CODE_A = "code_a"
 CONF_CODE_B = "code_b"
@@ -11,22 +31,50 @@ CONF_HDO_CODE = "hdo_code"  # For multiple HDO codes (405, 406, 410)
 CONF_PRICE_NT = "price_nt"
 CONF_PRICE_VT = "price_vt"
 CONF_CONFIG_TYPE = "config_type"  # Type of configuration
-CONF_UPDATE_INTERVAL = "update_interval"  # Update interval in minutes
+CONF_UPDATE_INTERVAL = "update_interval"  # State refresh (clock) interval in minutes
 CONF_COLOR_VT = "color_vt"  # Color for high tariff (VT) in hex
 CONF_COLOR_NT = "color_nt"  # Color for low tariff (NT) in hex
+CONF_REGION_UPDATE_INTERVAL = "region_update_interval"  # PSČ table refresh in hours
+CONF_HOURLY_FORMAT = "hourly_format"  # Encoding of the HDO_HOURLY attribute
+CONF_HORIZON_DAYS = "horizon_days"  # Days of schedule ahead (incl. today)
+CONF_ENERGY_ENTITY = "energy_entity"  # Power/energy sensor for the NT/VT totals
 
 # Configuration types
 CONFIG_TYPE_CLASSIC = "classic"  # Classic A+B+DP
 CONFIG_TYPE_HDO_CODES = "hdo_codes"  # Multiple HDO codes
 CONFIG_TYPE_SMART = "smart"  # Smart meter
 
+# HDO_HOURLY attribute formats
+HOURLY_FORMAT_COMPACT = "compact"  # [[start, end, "NT"/"VT"], ...] spans
+HOURLY_FORMAT_LEGACY = "legacy"  # {timestamp: price} every 15 minutes
+HOURLY_FORMAT_DISABLED = "disabled"  # No HDO_HOURLY attribute
+
 # Default values
 DEFAULT_PRICE_NT = 1.0
 DEFAULT_PRICE_VT = 2.0
 DEFAULT_NAME = "EGD HDO"
-DEFAULT_UPDATE_INTERVAL = 2  # minutes
+DEFAULT_UPDATE_INTERVAL = 1  # minutes
 DEFAULT_COLOR_VT = "#ff5252"  # Red for high tariff
 DEFAULT_COLOR_NT = "#2196f3"  # Blue for low tariff
+DEFAULT_REGION_UPDATE_INTERVAL = 24  # hours
+DEFAULT_HOURLY_FORMAT = HOURLY_FORMAT_COMPACT
+DEFAULT_HORIZON_DAYS = 2  # today + tomorrow
+MAX_HORIZON_DAYS = 14
+DATASET_UPDATE_INTERVAL = 6  # hours - HDO schedule changes a few times a year
+
+# Adaptive polling of the shared dataset
+DATASET_MAX_INTERVAL = 24  # hours, after repeated identical payloads
+DATASET_BOUNDARY_INTERVAL = 1  # hours, around dates records start or expire
+DATASET_BOUNDARY_WINDOW = 12  # hours before/after such a date
+DATASET_RETRY_INTERVAL = 5  # minutes, first retry after an error (then doubles)
+DATASET_JITTER = 0.1  # +- share of every interval, random per installation
+
+# Services
+SERVICE_FIND_CHEAPEST_WINDOW = "find_cheapest_window"
+ATTR_DURATION = "duration"  # Run time of the appliance
+ATTR_DEADLINE = "deadline"  # Must be finished by (default: end of the schedule)
+ATTR_SPLIT = "split"  # Allow several windows instead of one contiguous
+ATTR_POWER = "power"  # kW, to return the cost in Kč
 
 # Update interval (legacy - for backward compatibility)
 UPDATE_INTERVAL = 120  # seconds
@@ -1,36 +1,39 @@
 """Coordinator for EGD Distribuce integration."""
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta
+import hashlib
+import json
 import logging
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 
-import aiohttp
-import async_timeout
-import holidays
-
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_time_interval,
+)
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-try:
-    from .const import (
-        DOMAIN,
-        CONFIG_TYPE_CLASSIC,
-        CONFIG_TYPE_HDO_CODES,
-        CONFIG_TYPE_SMART,
-    )
-except ImportError:
-    # Pro testování mimo HA
-    DOMAIN = "egddistribuce"
-    CONFIG_TYPE_CLASSIC = "classic"
-    CONFIG_TYPE_HDO_CODES = "hdo_codes"
-    CONFIG_TYPE_SMART = "smart"
+from .const import (
+    DOMAIN,
+    CONFIG_TYPE_CLASSIC,
+    CONFIG_TYPE_HDO_CODES,
+    CONFIG_TYPE_SMART,
+    HOURLY_FORMAT_COMPACT,
+    HOURLY_FORMAT_LEGACY,
+)
+from .index import ValidityIndex
+from .schedule import HdoTimeline, elapsed, merge_intervals
+from .timing import StageTimings
 
-_LOGGER = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from .dataset import EGDDistribuceDataset
+    from .index import HdoRecordIndex
 
-API_REGION_URL = "https://hdo.distribuce24.cz/region"
-API_HDO_URL = "https://hdo.distribuce24.cz/casy"
+_LOGGER = logging.getLogger(__name__)
 
-# Default update interval (can be overridden in config)
-DEFAULT_UPDATE_INTERVAL = timedelta(minutes=2)
+# Default clock interval (can be overridden in config)
+DEFAULT_UPDATE_INTERVAL = timedelta(minutes=1)
 
 
 class EGDDistribuceCoordinator(DataUpdateCoordinator):
@@ -39,6 +42,7 @@ class EGDDistribuceCoordinator(DataUpdateCoordinator):
     def __init__(
         self,
         hass: HomeAssistant,
+        dataset: "EGDDistribuceDataset",
         config_type: str,
         psc: str = None,
         code_a: str = None,
@@ -47,17 +51,34 @@ class EGDDistribuceCoordinator(DataUpdateCoordinator):
         hdo_code: str = None,
         price_nt: float = 1.5,
         price_vt: float = 2.5,
-        update_interval: int = 2,  # in minutes
+        update_interval: int = 1,  # clock tick in minutes
         color_vt: str = "#ff5252",  # Red for high tariff
         color_nt: str = "#2196f3",  # Blue for low tariff
+        hourly_format: str = HOURLY_FORMAT_COMPACT,
+        horizon_days: int = 2,
     ):
         """Initialize coordinator."""
+        # Bez pollingu - rozvrh se obnovuje jen při nové verzi datasetu
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=update_interval),
         )
+        self.clock_interval = timedelta(minutes=update_interval)
+        self.dataset = dataset
+        self._dataset_version = None
+        # Zparsované časy pro (verzi datasetu, den) - bez změny se nepřepočítávají
+        self._parsed_key = None
+        self._parsed = None
+        # Filtrované záznamy podle platnosti (pro verzi datasetu) a sloty podle data
+        self._filtered: ValidityIndex | None = None
+        self._day_slots: dict[date, tuple] = {}
+        # Časovač na nejbližší změnu tarifu (NT <-> VT) nebo půlnoc
+        self._unsub_transition: CALLBACK_TYPE | None = None
+        # Rozvrh pro HDO kartu (websocket egddistribuce/schedule) s verzí
+        self.schedule: Dict[str, Any] | None = None
+        # Doby kroků (filtr, rozvrh, HDO_HOURLY, stav) pro diagnostiku
+        self.timings = StageTimings()
         self.config_type = config_type
         self.psc = psc
         self.code_a = code_a
@@ -68,377 +89,344 @@ class EGDDistribuceCoordinator(DataUpdateCoordinator):
         self.price_vt = price_vt
         self.color_vt = color_vt
         self.color_nt = color_nt
-        self.cz_holidays = holidays.country_holidays('CZ')
+        self.hourly_format = hourly_format
+        self.horizon_days = horizon_days
+
+    # Vrstva rozvrhu: záznamy datasetu -> zparsované sloty a časová osa.
+    # Běží jen při nové verzi datasetu (nebo novém dni), ne s každým tikem.
 
     async def _async_update_data(self) -> Dict[str, Any]:
-        """Fetch data from API."""
+        """Refresh the parsed schedule from the shared dataset."""
         try:
-            async with async_timeout.timeout(30):
-                async with aiohttp.ClientSession() as session:
-                    # Krok 1: Stáhnout HDO data
-                    hdo_data = await self._fetch_hdo_data(session)
-                    
-                    # Krok 2: Najít relevantní záznamy podle typu konfigurace
-                    if self.config_type == CONFIG_TYPE_CLASSIC:
-                        filtered = await self._filter_classic(session, hdo_data)
-                    elif self.config_type == CONFIG_TYPE_HDO_CODES:
-                        filtered = await self._filter_hdo_codes(session, hdo_data)
-                    else:  # CONFIG_TYPE_SMART
-                        filtered = self._filter_smart(hdo_data)
-                    
-                    # Krok 3: Zparsovat časy z filtrovaných záznamů
-                    return self._parse_times(filtered)
-                    
+            # Krok 1: Sdílená HDO data (stahují se jednou pro všechny záznamy)
+            index = await self.dataset.async_get_index()
+            self._update_schedule(index)
         except Exception as err:
             raise UpdateFailed(f"Error fetching data: {err}")
 
-    async def _fetch_hdo_data(self, session: aiohttp.ClientSession) -> list:
-        """Stáhnout HDO data z API."""
-        async with session.get(API_HDO_URL) as response:
-            response.raise_for_status()
-            return await response.json()
-
-    async def _fetch_region(self, session: aiohttp.ClientSession) -> str:
-        """Zjistit region z PSČ."""
-        async with session.get(API_REGION_URL) as response:
-            response.raise_for_status()
-            data = await response.json()
-            
-        region_records = [x for x in data if x.get('PSC') == self.psc]
-        if not region_records:
+        return self._state_now()
+
+    def _update_schedule(self, index: "HdoRecordIndex") -> None:
+        """Zparsovat sloty pro (verzi datasetu, den), pokud ještě nejsou."""
+        version = self.dataset.version
+        today = dt_util.now().date()
+        if (version, today) == self._parsed_key:
+            return
+
+        if version != self._dataset_version or self._filtered is None:
+            # Krok 2: Najít relevantní záznamy podle typu konfigurace
+            with self.timings.measure("filter"):
+                if self.config_type == CONFIG_TYPE_CLASSIC:
+                    filtered = self._filter_classic(index)
+                elif self.config_type == CONFIG_TYPE_HDO_CODES:
+                    filtered = self._filter_hdo_codes(index)
+                else:  # CONFIG_TYPE_SMART
+                    filtered = self._filter_smart(index)
+
+                # Nové záznamy - platnost jednou, sloty všech dnů se spočítají znovu
+                self._filtered = ValidityIndex(filtered)
+            self._day_slots = {}
+            self._dataset_version = version
+        else:
+            # Nový den - sloty dalších dnů zůstávají, minulé se zahodí
+            self._day_slots = {
+                day: slots for day, slots in self._day_slots.items() if day >= today
+            }
+
+        # Krok 3: Sestavit rozvrh z (memoizovaných) slotů jednotlivých dnů
+        with self.timings.measure("schedule"):
+            self._parsed = self._parse_times(self._filtered, today)
+            self.schedule = self._build_schedule(self._parsed)
+        self._parsed_key = (version, today)
+
+    # Vrstva hodin: zparsovaná časová osa -> aktuální stav, bez I/O.
+    # Tiká každých update_interval minut a přesně při změně tarifu.
+
+    @callback
+    def async_start_clock(self) -> CALLBACK_TYPE:
+        """Start the local clock, return a callback stopping it."""
+        unsub_tick = async_track_time_interval(
+            self.hass, self._async_clock_tick, self.clock_interval
+        )
+
+        @callback
+        def _stop() -> None:
+            unsub_tick()
+            self._cancel_transition()
+
+        return _stop
+
+    @callback
+    def _async_clock_tick(self, _now: datetime | None = None) -> None:
+        """Přepočítat stav z časové osy a oznámit ho entitám."""
+        try:
+            if (self.dataset.version, dt_util.now().date()) != self._parsed_key:
+                # Nový den - sloty se sestaví z indexu v paměti
+                self._update_schedule(self.dataset.index)
+            data = self._state_now()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning(f"Error recomputing HDO state: {err}")
+            return
+        self.async_set_updated_data(data)
+
+    def _state_now(self) -> Dict[str, Any]:
+        """Aktuální stav podle času (bez parsování) + časovač na další změnu."""
+        with self.timings.measure("state"):
+            data = self._current_state(self._parsed)
+        self._schedule_transition(data["timeline"])
+        return data
+
+    @callback
+    def _schedule_transition(self, timeline: HdoTimeline) -> None:
+        """Naplánovat tik přesně na nejbližší změnu tarifu."""
+        self._cancel_transition()
+
+        # Časová osa pokrývá dnes + zítra, o půlnoci se musí znovu sestavit
+        when = timeline.start + timedelta(days=1)
+        transition = timeline.next_transition(dt_util.now())
+        if transition is not None and transition[0] < when:
+            when = transition[0]
+
+        self._unsub_transition = async_track_point_in_time(
+            self.hass, self._async_clock_tick, when
+        )
+
+    @callback
+    def _cancel_transition(self) -> None:
+        """Zrušit časovač změny tarifu."""
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+
+    @property
+    def schedule_version(self) -> str | None:
+        """Verze rozvrhu - mění se jen když se změní obsah pro kartu."""
+        return self.schedule["version"] if self.schedule is not None else None
+
+    @property
+    def timeline(self) -> HdoTimeline | None:
+        """Předpočítaná časová osa NT/VT (None před prvním načtením)."""
+        return self._parsed["timeline"] if self._parsed is not None else None
+
+    @property
+    def record_count(self) -> int | None:
+        """Počet záznamů této entry (None před prvním načtením)."""
+        return len(self._filtered) if self._filtered is not None else None
+
+    @callback
+    def async_dataset_updated(self) -> None:
+        """Přepočítat data když sdílený dataset stáhl novou verzi."""
+        if self.dataset.version != self._dataset_version:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    def _find_region(self) -> str:
+        """Zjistit region z PSČ (tabulka regionů je součástí sdíleného datasetu)."""
+        region = self.dataset.psc_regions.get(self.psc)
+        if region is None:
             raise UpdateFailed(f"Region not found for PSČ: {self.psc}")
-        
-        # Vrátit první unikátní region
-        return region_records[0]['Region']
 
-    async def _filter_classic(self, session: aiohttp.ClientSession, hdo_data: list) -> list:
+        return region
+
+    def _filter_classic(self, index: "HdoRecordIndex") -> list:
         """VARIANTA 1: Classic - PSČ + A + B + DP"""
-        region = await self._fetch_region(session)
+        region = self._find_region()
         
         _LOGGER.debug(f"Classic filter: region={region}, A={self.code_a}, B={self.code_b}, DP={self.code_dp}")
         
-        filtered = [
-            x for x in hdo_data
-            if x.get('region') == region
-            and x.get('A') == self.code_a
-            and x.get('B') == self.code_b
-            and (x.get('DP') == self.code_dp or x.get('DP') == '0' + self.code_dp)
-        ]
+        filtered = index.classic(region, self.code_a, self.code_b, self.code_dp)
         
         _LOGGER.debug(f"Classic filter: found {len(filtered)} records")
         return filtered
 
-    async def _filter_hdo_codes(self, session: aiohttp.ClientSession, hdo_data: list) -> list:
+    def _filter_hdo_codes(self, index: "HdoRecordIndex") -> list:
         """VARIANTA 2: HDO Codes - PSČ + seznam kódů (405,406,410)"""
-        region = await self._fetch_region(session)
+        region = self._find_region()
         codes = [c.strip() for c in self.hdo_code.split(',')]
         
         _LOGGER.debug(f"HDO Codes filter: region={region}, codes={codes}")
         
         filtered = []
         for code in codes:
-            matches = [
-                x for x in hdo_data
-                if x.get('region') == region
-                and x.get('kodHdo_A') == code
-            ]
-            filtered.extend(matches)
+            filtered.extend(index.region_code(region, code))
         
         _LOGGER.debug(f"HDO Codes filter: found {len(filtered)} records")
         return filtered
 
-    def _filter_smart(self, hdo_data: list) -> list:
+    def _filter_smart(self, index: "HdoRecordIndex") -> list:
         """VARIANTA 3: Smart - jen kodHdo_A (Cd56), žádný region"""
         _LOGGER.debug(f"Smart filter: code={self.hdo_code}")
         
-        filtered = [
-            x for x in hdo_data
-            if x.get('kodHdo_A') == self.hdo_code
-        ]
+        filtered = index.code(self.hdo_code)
         
         _LOGGER.debug(f"Smart filter: found {len(filtered)} records")
         return filtered
 
-    def _parse_times(self, filtered_records: list) -> Dict[str, Any]:
-        """Zparsovat HDO časy z filtrovaných záznamů."""
-        date_now = datetime.now().date()
-        date_tomorrow = date_now + timedelta(days=1)
-        current_month = datetime.now().month
-        
-        hdo_times_today = []
-        hdo_times_tomorrow = []
-        
-        _LOGGER.debug(f"Parsing {len(filtered_records)} records for date={date_now}")
-        
-        for record in filtered_records:
-            od_year = int(record['od']['rok'])
-            od_month = int(record['od']['mesic'])
-            do_month = int(record['do']['mesic'])
-            
-            # Kontrola platnosti záznamu
-            if od_year == 9999:
-                # Pattern který se opakuje každý rok (např. léto/zima)
-                if od_month <= do_month:
-                    # Normální období (např. 4-9)
-                    if not (od_month <= current_month <= do_month):
-                        continue
-                else:
-                    # Období přes rok (např. 10-3)
-                    if not (current_month >= od_month or current_month <= do_month):
-                        continue
-            else:
-                # Konkrétní rok - validace přes datum
-                current_year = datetime.now().year
-                do_year = int(record['do']['rok'])
-                
-                if od_year < current_year and od_month > current_month:
-                    current_year = current_year - 1
-                if do_year < od_year:
-                    do_year = do_year + 1
-                
-                try:
-                    date_od = datetime(current_year, od_month, int(record['od']['den'])).date()
-                    date_do = datetime(do_year, do_month, int(record['do']['den'])).date()
-                except ValueError:
-                    continue
-                
-                if not (date_od <= date_now <= date_do):
-                    continue
-            
-            # Záznam je platný - zparsovat časy
-            for sazba in record.get('sazby', []):
-                for day in sazba.get('dny', []):
-                    day_code = day['denVTydnu']
-                    
-                    # Dnes
-                    if self._is_matching_day(date_now, day_code):
-                        for cas in day.get('casy', []):
-                            hdo_times_today.append({'od': cas['od'], 'do': cas['do']})
-                    
-                    # Zítra
-                    if self._is_matching_day(date_tomorrow, day_code):
-                        for cas in day.get('casy', []):
-                            hdo_times_tomorrow.append({'od': cas['od'], 'do': cas['do']})
-        
-        # Seřadit časy
-        hdo_times_today = sorted(hdo_times_today, key=lambda x: x['od'])
-        hdo_times_tomorrow = sorted(hdo_times_tomorrow, key=lambda x: x['od'])
+    def _parse_times(self, filtered_records: ValidityIndex, date_now: date) -> Dict[str, Any]:
+        """Sestavit rozvrh na horizont dnů ze slotů jednotlivých dnů."""
+        # Časová osa vždy aspoň dnes + zítra (zbývající čas přes půlnoc)
+        days = [date_now + timedelta(days=i) for i in range(max(self.horizon_days, 2))]
+        day_slots = [self._get_day_slots(filtered_records, day) for day in days]
+        hdo_times_today, hdo_times_tomorrow = day_slots[0][0], day_slots[1][0]
         
         _LOGGER.debug(f"Found {len(hdo_times_today)} slots today, {len(hdo_times_tomorrow)} tomorrow")
         
         # Získat region z prvního záznamu (pokud existuje)
-        region = filtered_records[0].get('region', 'N/A') if filtered_records else 'N/A'
+        records = filtered_records.records
+        region = (records[0].region or 'N/A') if records else 'N/A'
         
         # Pro TOU (Time of Use) tariffy jsou časy INVERTOVANÉ
         # API časy znamenají kdy JE nízký tarif (NT), ne HDO signál
         is_tou = region == 'TOU'
         
-        # Zjistit aktuální stav a zbývající čas
-        current_time = datetime.now().time()
-        is_in_time_slot = self._is_time_active(current_time, hdo_times_today)
-        
-        # Určit cenu a stav podle typu
-        if is_tou:
-            # TOU: časy = kdy JE NT
-            current_price = self.price_nt if is_in_time_slot else self.price_vt
-            # Status: Zapnuto = NT perioda (levná elektřina)
-            is_active = is_in_time_slot
-        else:
-            # Klasické HDO: časy = HDO signál = NT
-            current_price = self.price_nt if is_in_time_slot else self.price_vt
-            # Status: Zapnuto = HDO signál aktivní
-            is_active = is_in_time_slot
-        
-        remaining_time = self._calculate_remaining_time(current_time, hdo_times_today, hdo_times_tomorrow, is_tou)
+        # Časová osa přechodů NT/VT přes celý horizont
+        timeline = HdoTimeline(
+            date_now,
+            [intervals for _, intervals in day_slots],
+            dt_util.now().tzinfo,
+        )
+        horizon_end = timeline.start + timedelta(days=self.horizon_days)
         
-        # Vygenerovat HDO_HOURLY pro dalších 24 hodin
-        HDO_HOURLY = self._generate_hdo_hourly(hdo_times_today, hdo_times_tomorrow, is_tou)
+        # Vygenerovat HDO_HOURLY na horizont ve zvoleném formátu
+        with self.timings.measure("hourly"):
+            if self.hourly_format == HOURLY_FORMAT_COMPACT:
+                HDO_HOURLY = self._generate_hdo_spans(timeline, horizon_end)
+            elif self.hourly_format == HOURLY_FORMAT_LEGACY:
+                HDO_HOURLY = self._generate_hdo_hourly(timeline, horizon_end, is_tou)
+            else:  # HOURLY_FORMAT_DISABLED
+                HDO_HOURLY = None
         
         return {
-            "is_active": is_active,
             "hdo_times_today": hdo_times_today,
             "hdo_times_tomorrow": hdo_times_tomorrow,
-            "current_price": current_price,
-            "remaining_time": remaining_time,
+            "timeline": timeline,
             "region": region,
             "HDO_HOURLY": HDO_HOURLY,
         }
 
-    def _is_matching_day(self, date: datetime.date, day_code: int) -> bool:
-        """Kontrola zda datum odpovídá kódu dne."""
-        is_holiday = date in self.cz_holidays
-        
-        # Svátek = neděle
-        if is_holiday and day_code == 7:
-            return True
-        
-        # Pracovní den
-        if not is_holiday and date.isoweekday() == day_code:
-            return True
-        
-        return False
-
-    def _is_time_active(self, current_time: time, hdo_times: list) -> bool:
-        """Kontrola zda je aktuální čas v HDO slotu."""
-        for slot in hdo_times:
-            try:
-                start = datetime.strptime(slot['od'], "%H:%M:%S").time()
-                end = datetime.strptime(slot['do'], "%H:%M:%S").time()
-                
-                # Speciální případ: 23:59:00 znamená konec dne (23:59:59)
-                if slot['do'] == '23:59:00':
-                    # Kontrola: start <= current_time <= 23:59:59
-                    end_of_day = time(23, 59, 59)
-                    if start <= current_time <= end_of_day:
-                        return True
-                else:
-                    # Fix pro ostatní časy končící :59:00 (měly by být :00:00 další hodiny)
-                    if slot['do'].endswith(':59:00'):
-                        end = (datetime.combine(datetime.today(), end) + timedelta(minutes=1)).time()
-                    
-                    if start <= current_time < end:
-                        return True
-            except ValueError:
-                continue
-        
-        return False
+    def _build_schedule(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Rozvrh pro HDO kartu: úseky NT/VT přes celou časovou osu a ceny."""
+        timeline: HdoTimeline = parsed["timeline"]
+        schedule = {
+            "region": parsed["region"],
+            "start": timeline.start.isoformat(),
+            "end": timeline.end.isoformat(),
+            "spans": self._generate_hdo_spans(timeline, timeline.end),
+            "hdo_times_today": parsed["hdo_times_today"],
+            "hdo_times_tomorrow": parsed["hdo_times_tomorrow"],
+            "price_nt": self.price_nt,
+            "price_vt": self.price_vt,
+            "color_nt": self.color_nt,
+            "color_vt": self.color_vt,
+        }
+        # Verze podle obsahu - karta stahuje rozvrh znovu jen když se liší
+        schedule["version"] = hashlib.sha1(
+            json.dumps(schedule, sort_keys=True).encode()
+        ).hexdigest()[:12]
+        return schedule
 
-    def _calculate_remaining_time(self, current_time: time, hdo_times_today: list, hdo_times_tomorrow: list, is_tou: bool = False) -> str:
-        """Vypočítat zbývající čas do změny HDO.
-        
-        Args:
-            is_tou: Pokud True, časy jsou invertované (značí kdy JE NT, ne HDO signál)
-        """
-        now = datetime.now()
-        
-        # Pro TOU zjistit jestli jsme MIMO slot (= jsme v NT)
-        is_in_slot = self._is_time_active(current_time, hdo_times_today)
-        
-        if is_tou:
-            # Pro TOU: pokud jsme VE slotu, jsme v NT, zbývá do konce NT
-            # Pokud jsme MIMO slot, jsme ve VT, zbývá do začátku NT
-            if is_in_slot:
-                # Jsme v NT - najít konec slotu
-                for slot in hdo_times_today:
-                    try:
-                        start = datetime.strptime(slot['od'], "%H:%M:%S").time()
-                        end = datetime.strptime(slot['do'], "%H:%M:%S").time()
-                        
-                        if slot['do'].endswith(':59:00'):
-                            end = (datetime.combine(datetime.today(), end) + timedelta(minutes=1)).time()
-                        
-                        if start <= current_time < end:
-                            end_datetime = datetime.combine(now.date(), end)
-                            remaining = end_datetime - now
-                            hours, remainder = divmod(remaining.seconds, 3600)
-                            minutes = remainder // 60
-                            return f"{hours}:{minutes:02d}"
-                    except ValueError:
-                        continue
-            else:
-                # Jsme ve VT - najít začátek dalšího NT slotu
-                for slot in hdo_times_today:
-                    try:
-                        start = datetime.strptime(slot['od'], "%H:%M:%S").time()
-                        if start > current_time:
-                            start_datetime = datetime.combine(now.date(), start)
-                            remaining = start_datetime - now
-                            hours, remainder = divmod(remaining.seconds, 3600)
-                            minutes = remainder // 60
-                            return f"{hours}:{minutes:02d}"
-                    except ValueError:
-                        continue
-        else:
-            # Klasické HDO - pokud je aktivní, najít konec
-            if is_in_slot:
-                for slot in hdo_times_today:
-                    try:
-                        start = datetime.strptime(slot['od'], "%H:%M:%S").time()
-                        end = datetime.strptime(slot['do'], "%H:%M:%S").time()
-                        
-                        if slot['do'].endswith(':59:00'):
-                            end = (datetime.combine(datetime.today(), end) + timedelta(minutes=1)).time()
-                        
-                        if start <= current_time < end:
-                            end_datetime = datetime.combine(now.date(), end)
-                            remaining = end_datetime - now
-                            hours, remainder = divmod(remaining.seconds, 3600)
-                            minutes = remainder // 60
-                            return f"{hours}:{minutes:02d}"
-                    except ValueError:
-                        continue
-            else:
-                # HDO není aktivní - najít začátek dalšího slotu
-                for slot in hdo_times_today:
-                    try:
-                        start = datetime.strptime(slot['od'], "%H:%M:%S").time()
-                        if start > current_time:
-                            start_datetime = datetime.combine(now.date(), start)
-                            remaining = start_datetime - now
-                            hours, remainder = divmod(remaining.seconds, 3600)
-                            minutes = remainder // 60
-                            return f"{hours}:{minutes:02d}"
-                    except ValueError:
-                        continue
+    def _get_day_slots(self, filtered_records: ValidityIndex, day: date) -> tuple:
+        """Sloty dne (raw, intervaly) - počítají se jednou za den a verzi datasetu."""
+        if (slots := self._day_slots.get(day)) is None:
+            slots = self._day_slots[day] = self._parse_day(filtered_records, day)
+        return slots
+
+    def _parse_day(self, filtered_records: ValidityIndex, day: date) -> tuple:
+        """Zparsovat HDO časy jednoho dne z filtrovaných záznamů."""
+        _LOGGER.debug(f"Parsing {len(filtered_records)} records for date={day}")
+        
+        # Kód dne (svátek = neděle) ze sdíleného kalendáře
+        day_code = self.dataset.calendar.day_code(day)
+        
+        hdo_times = []
+        intervals = []
+        # Jen záznamy platné v daný den (rozsahy platnosti jsou předpočítané)
+        for record in filtered_records.records_on(day):
+            for slot in record.slots(day_code):
+                hdo_times.append({'od': slot.od, 'do': slot.do})
+                intervals.append((slot.start, slot.end))
+        
+        # Seřadit časy, intervaly sloučit
+        hdo_times = sorted(hdo_times, key=lambda x: x['od'])
+        return hdo_times, merge_intervals(intervals)
+
+    def _current_state(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Určit aktuální stav z časové osy (bez parsování)."""
+        timeline: HdoTimeline = parsed["timeline"]
+        now = dt_util.now()
         
-        # Žádný další slot dnes - vrátit čas do prvního slotu zítra
-        if hdo_times_tomorrow:
-            try:
-                first_tomorrow = datetime.strptime(hdo_times_tomorrow[0]['od'], "%H:%M:%S").time()
-                tomorrow = now.date() + timedelta(days=1)
-                next_datetime = datetime.combine(tomorrow, first_tomorrow)
-                remaining = next_datetime - now
-                hours, remainder = divmod(remaining.seconds, 3600)
-                minutes = remainder // 60
-                return f"{hours}:{minutes:02d}"
-            except ValueError:
-                pass
+        # TOU: časy = kdy JE NT (Zapnuto = NT perioda, levná elektřina)
+        # Klasické HDO: časy = HDO signál = NT (Zapnuto = HDO signál aktivní)
+        is_active = timeline.state_at(now)
+        current_price = self.price_nt if is_active else self.price_vt
         
-        return "N/A"
+        return {
+            "is_active": is_active,
+            "hdo_times_today": parsed["hdo_times_today"],
+            "hdo_times_tomorrow": parsed["hdo_times_tomorrow"],
+            "current_price": current_price,
+            "remaining_time": self._calculate_remaining_time(timeline, now),
+            "region": parsed["region"],
+            "HDO_HOURLY": parsed["HDO_HOURLY"],
+            "timeline": timeline,
+        }
 
-    def _generate_hdo_hourly(self, hdo_times_today: list, hdo_times_tomorrow: list, is_tou: bool = False) -> dict:
-        """Vygenerovat HDO_HOURLY atribut - 15minutové intervaly na 48 hodin (dnes + zítra).
+    def _calculate_remaining_time(self, timeline: HdoTimeline, now: datetime) -> str:
+        """Vypočítat zbývající čas do změny HDO (NT <-> VT)."""
+        transition = timeline.next_transition(now)
+        if transition is None:
+            return "N/A"
+        
+        remaining = elapsed(now, transition[0])
+        hours, remainder = divmod(int(remaining.total_seconds()), 3600)
+        minutes = remainder // 60
+        return f"{hours}:{minutes:02d}"
+
+    def _generate_hdo_hourly(self, timeline: HdoTimeline, end: datetime, is_tou: bool = False) -> dict:
+        """Vygenerovat HDO_HOURLY atribut - 15minutové intervaly od dnešní půlnoci do end.
         
         Args:
             is_tou: Pokud True, časy jsou invertované (značí kdy JE NT, ne HDO signál)
         """
-        now = datetime.now()
         result = {}
-        date_today = now.date()
-        date_tomorrow = date_today + timedelta(days=1)
-        
-        # Generovat dnes (96 intervalů = 24 hodin * 4)
-        for i in range(96):
-            timestamp = datetime.combine(date_today, time(hour=0)) + timedelta(minutes=i * 15)
-            time_check = timestamp.time()
-            
-            is_in_slot = self._is_time_active(time_check, hdo_times_today)
-            
-            # Pro TOU: ve slotu = NT, mimo slot = VT
-            # Pro klasické HDO: ve slotu = NT (HDO aktivní)
-            if is_tou:
-                price = self.price_nt if is_in_slot else self.price_vt
-            else:
-                price = self.price_nt if is_in_slot else self.price_vt
+        step = timedelta(minutes=15)
+        
+        # Pro TOU: ve slotu = NT, mimo slot = VT
+        # Pro klasické HDO: ve slotu = NT (HDO aktivní)
+        # 96 intervalů na den = 24 hodin * 4 (92/100 ve dnech změny času),
+        # krok se počítá v UTC
+        timestamp = dt_util.as_utc(timeline.start)
+        end = dt_util.as_utc(end)
+        while timestamp < end:
+            price = self.price_nt if timeline.state_at(timestamp) else self.price_vt
             
-            # Použít datetime objekt jako klíč (bez timezone) - kompatibilní se starou verzí
-            result[timestamp] = float(price)
-        
-        # Generovat zítra (96 intervalů = 24 hodin * 4)
-        for i in range(96):
-            timestamp = datetime.combine(date_tomorrow, time(hour=0)) + timedelta(minutes=i * 15)
-            time_check = timestamp.time()
-            
-            is_in_slot = self._is_time_active(time_check, hdo_times_tomorrow)
-            
-            # Pro TOU: ve slotu = NT, mimo slot = VT
-            # Pro klasické HDO: ve slotu = NT (HDO aktivní)
-            if is_tou:
-                price = self.price_nt if is_in_slot else self.price_vt
-            else:
-                price = self.price_nt if is_in_slot else self.price_vt
-            
-            # Použít datetime objekt jako klíč (bez timezone) - kompatibilní se starou verzí
-            result[timestamp] = float(price)
+            # Klíč je lokální čas včetně posunu (dvakrát 02:00 při přechodu na zimní čas)
+            result[dt_util.as_local(timestamp).isoformat()] = float(price)
+            timestamp += step
         
         return result
+
+    def _generate_hdo_spans(self, timeline: HdoTimeline, end: datetime) -> list:
+        """Vygenerovat kompaktní HDO_HOURLY - úseky [začátek, konec, "NT"/"VT"] do end.
+        
+        Místo 96 bodů na den jen jeden záznam na každý úsek mezi změnami tarifu.
+        """
+        spans = []
+        start = timeline.start
+        state = timeline.state_at(start)
+        for moment, new_state in timeline.iter_transitions(start, end):
+            if moment > start:
+                spans.append([start.isoformat(), moment.isoformat(), "NT" if state else "VT"])
+            start, state = moment, new_state
+        spans.append([start.isoformat(), end.isoformat(), "NT" if state else "VT"])
+        return spans
+
+
+@callback
+def async_get_entity_coordinator(
+    hass: HomeAssistant, entity_id: str
+) -> "EGDDistribuceCoordinator | None":
+    """Return the coordinator of the entry an entity of this integration belongs to."""
+    entity = er.async_get(hass).async_get(entity_id)
+    if entity is None or entity.platform != DOMAIN:
+        return None
+    return hass.data.get(DOMAIN, {}).get(entity.config_entry_id)
@@ -0,0 +1,411 @@
+"""Shared HDO dataset for all EGD Distribuce config entries."""
+from __future__ import annotations
+
+import asyncio
+import base64
+from datetime import datetime, timedelta
+import json
+import logging
+from typing import Any
+import zlib
+
+import async_timeout
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import CachedPayload, ConnectionStats, EGDDistribuceApi
+from .const import (
+    API_BASE_URL,
+    API_HDO_PATH,
+    API_REGION_PATH,
+    DATA_BASE_URL,
+    DATA_DATASET,
+    DATA_FILTER_RECORDS,
+    DATASET_BOUNDARY_INTERVAL,
+    DATASET_BOUNDARY_WINDOW,
+    DATASET_JITTER,
+    DATASET_MAX_INTERVAL,
+    DATASET_RETRY_INTERVAL,
+    DATASET_UPDATE_INTERVAL,
+    DEFAULT_REGION_UPDATE_INTERVAL,
+    DOMAIN,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from .daytype import DayTypeCalendar
+from .index import (
+    HdoRecordIndex,
+    RecordFilter,
+    ValidityBoundaries,
+    build_psc_index,
+)
+from .polling import AdaptivePolling
+from .schedule import elapsed
+from .timing import StageTimings
+
+_LOGGER = logging.getLogger(__name__)
+
+# Payloads kept in the snapshot: snapshot key -> API path
+SNAPSHOT_PAYLOADS = {"casy": API_HDO_PATH, "region": API_REGION_PATH}
+
+
+class EGDDistribuceDataset(DataUpdateCoordinator[list]):
+    """Download the /casy and /region payloads once and share them.
+
+    Every entry coordinator subscribes to this one and follows tariff
+    changes locally from the parsed slots.
+
+    The schedule changes only a few times a year, so it is re-validated
+    every few hours: less often while nothing changes, more often around
+    the dates records start or expire, backing off on errors. The PSČ ->
+    region table almost never changes and is re-validated daily by default.
+
+    The last good payloads are kept in .storage so entries can start from
+    them without waiting for the API.
+
+    With `filter_records`, /casy is decoded as it streams in and only the
+    records of the registered entries' regions and smart codes are kept.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        base_url: str = API_BASE_URL,
+        filter_records: bool = True,
+    ) -> None:
+        """Initialize the shared dataset."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_dataset",
+            update_interval=timedelta(hours=DATASET_UPDATE_INTERVAL),
+        )
+        self.base_url = base_url.rstrip("/")
+        self.filter_records = filter_records
+        # Jedna session nad sdíleným connection poolem HA (keep-alive, DNS cache)
+        stats = ConnectionStats()
+        # Doby jednotlivých kroků obnovy (stahování, dekódování, index)
+        self.timings = StageTimings()
+        self.api = EGDDistribuceApi(
+            async_create_clientsession(
+                hass, auto_cleanup=False, trace_configs=[stats.trace_config()]
+            ),
+            stats,
+            self.timings,
+        )
+        # Kódy dnů (svátky) pro všechny záznamy
+        self.calendar = DayTypeCalendar()
+        self.psc_regions: dict[str, str] = {}
+        self.regions_updated: datetime | None = None
+        self.version = 0
+        self._index: HdoRecordIndex | None = None
+        self._index_version: int | None = None
+        self._region_intervals: dict[str, int] = {}
+        # Co která entry potřebuje: (PSČ, smart kód) a filtr aktuálních dat
+        self._selectors: dict[str, tuple[str | None, str | None]] = {}
+        self.records_filter: RecordFilter | None = None
+        self._regions_lock = asyncio.Lock()
+        self._lock = asyncio.Lock()
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._snapshot_loaded = False
+        # Data jsou ze snapshotu a od té doby se nestahovala
+        self._snapshot_stale = False
+        # Interval dalšího stažení podle chyb, změn a hranic platnosti
+        self.polling = AdaptivePolling(
+            base=timedelta(hours=DATASET_UPDATE_INTERVAL),
+            maximum=timedelta(hours=DATASET_MAX_INTERVAL),
+            boundary=timedelta(hours=DATASET_BOUNDARY_INTERVAL),
+            window=timedelta(hours=DATASET_BOUNDARY_WINDOW),
+            retry=timedelta(minutes=DATASET_RETRY_INTERVAL),
+            jitter=DATASET_JITTER,
+        )
+        self._boundaries: ValidityBoundaries | None = None
+
+    async def _async_update_data(self) -> list:
+        """Fetch the whole HDO dataset from the API."""
+        self._snapshot_stale = False
+        try:
+            async with async_timeout.timeout(30):
+                # Nejdřív regiony - filtr záznamů z nich vychází
+                regions_changed = await self._async_update_regions()
+                record_filter = self.record_filter()
+                with self.timings.measure("fetch_casy"):
+                    records, records_changed = await self._fetch_hdo_data(record_filter)
+        except Exception as err:
+            self.update_interval = self.polling.failed()
+            raise UpdateFailed(
+                f"Error fetching HDO dataset: {err} (retry in {self.update_interval})"
+            ) from err
+        finally:
+            _LOGGER.debug("HDO API connections: %s", self.api.stats)
+
+        if records_changed or self._boundaries is None:
+            self._boundaries = ValidityBoundaries(records)
+        self.update_interval = self._next_interval(records_changed)
+        _LOGGER.debug("Next HDO dataset refresh in %s", self.update_interval)
+
+        # Beze změny - verze zůstává, odběratelé nemusí nic přepočítávat
+        if not (records_changed or regions_changed) and self.data is not None:
+            return self.data
+
+        if records_changed:
+            self.records_filter = record_filter
+        self.version += 1
+        _LOGGER.debug("HDO dataset v%s: %s records", self.version, len(records))
+
+        self.hass.async_create_background_task(
+            self._async_save_snapshot(), f"{DOMAIN} dataset snapshot"
+        )
+        return records
+
+    def _next_interval(self, changed: bool) -> timedelta:
+        """Interval of the next poll after a successful one."""
+        now = dt_util.now()
+        since = until = None
+        if (previous := self._boundaries.previous(now.date())) is not None:
+            since = elapsed(dt_util.start_of_local_day(previous), now)
+        if (following := self._boundaries.next(now.date())) is not None:
+            until = elapsed(now, dt_util.start_of_local_day(following))
+        return self.polling.succeeded(changed, since, until)
+
+    async def _fetch_hdo_data(
+        self, record_filter: RecordFilter | None = None
+    ) -> tuple[list, bool]:
+        """Stáhnout HDO data z API (podmíněně, jen pokud se změnila)."""
+        return await self.api.async_get_json(self.url(API_HDO_PATH), record_filter)
+
+    async def _fetch_regions(self) -> tuple[list, bool]:
+        """Stáhnout tabulku PSČ -> region (podmíněně)."""
+        return await self.api.async_get_json(self.url(API_REGION_PATH))
+
+    def url(self, path: str) -> str:
+        """Return the full URL of an API path."""
+        return f"{self.base_url}{path}"
+
+    def record_filter(self) -> RecordFilter | None:
+        """Union of the records the registered entries use (None = all)."""
+        if not self.filter_records or not self._selectors:
+            return None
+        regions = set()
+        codes = set()
+        for psc, code in self._selectors.values():
+            if psc is not None and (region := self.psc_regions.get(psc)) is not None:
+                regions.add(region)
+            if code is not None:
+                codes.add(code)
+        return RecordFilter(frozenset(regions), frozenset(codes))
+
+    def _covers(self, wanted: RecordFilter | None) -> bool:
+        """Return True if the current records include everything wanted."""
+        if self.records_filter is None:
+            return True
+        return wanted is not None and self.records_filter.covers(wanted)
+
+    @property
+    def region_update_interval(self) -> timedelta:
+        """How long the PSČ table is used before it is re-validated."""
+        return timedelta(
+            hours=min(
+                self._region_intervals.values(),
+                default=DEFAULT_REGION_UPDATE_INTERVAL,
+            )
+        )
+
+    async def _async_update_regions(self) -> bool:
+        """Re-validate the PSČ table if it is due, return True if it changed."""
+        async with self._regions_lock:
+            if (
+                self.psc_regions
+                and self.regions_updated is not None
+                and dt_util.utcnow() - self.regions_updated < self.region_update_interval
+            ):
+                return False
+
+            with self.timings.measure("fetch_region"):
+                regions, changed = await self._fetch_regions()
+            self.regions_updated = dt_util.utcnow()
+            if changed or not self.psc_regions:
+                self.psc_regions = build_psc_index(regions)
+                _LOGGER.debug("PSČ table indexed: %s entries", len(self.psc_regions))
+                return True
+            return False
+
+    async def async_get_psc_regions(self) -> dict[str, str]:
+        """Return the PSČ -> region table, fetching it only when it is due."""
+        if await self._async_update_regions():
+            # Nová tabulka regionů - odběratelé musí znovu vyhledat svůj region
+            self.version += 1
+        return self.psc_regions
+
+    async def async_get_records(self) -> list:
+        """Return the dataset, downloading it first if nobody has yet."""
+        async with self._lock:
+            # Nová entry může potřebovat záznamy, které se při stažení zahodily
+            if self.data is None or not self._covers(self.record_filter()):
+                await self.async_refresh()
+
+        if self.data is None:
+            raise UpdateFailed(f"HDO dataset not available: {self.last_exception}")
+        return self.data
+
+    @property
+    def index(self) -> HdoRecordIndex:
+        """Lookup index of the current records, built once per version."""
+        if self._index is None or self._index_version != self.version:
+            with self.timings.measure("index"):
+                self._index = HdoRecordIndex(self.data or [])
+            self._index_version = self.version
+            _LOGGER.debug("HDO dataset v%s indexed", self.version)
+        return self._index
+
+    async def async_get_index(self) -> HdoRecordIndex:
+        """Return the record index, downloading the dataset first if needed."""
+        await self.async_get_records()
+        return self.index
+
+    async def async_load_snapshot(self) -> None:
+        """Start from the snapshot on disk and refresh it in the background."""
+        async with self._lock:
+            if self._snapshot_loaded:
+                return
+            self._snapshot_loaded = True
+
+            if (stored := await self._store.async_load()) is None:
+                return
+
+            try:
+                payloads = await self.hass.async_add_executor_job(
+                    _decode_snapshot, stored
+                )
+            except (KeyError, TypeError, ValueError, zlib.error) as err:
+                _LOGGER.warning("Ignoring unreadable HDO snapshot: %s", err)
+                return
+
+            # Co už je stažené (např. z config flow) je novější než snapshot
+            for key, path in SNAPSHOT_PAYLOADS.items():
+                if self.api.get_cached(self.url(path)) is None:
+                    self.api.set_cached(self.url(path), payloads[key])
+            if not self.psc_regions:
+                self.psc_regions = build_psc_index(payloads["region"].data)
+                if regions_updated := stored.get("regions_updated"):
+                    self.regions_updated = dt_util.parse_datetime(regions_updated)
+            records = self.api.get_cached(self.url(API_HDO_PATH))
+            self.data = records.data
+            self.records_filter = records.record_filter
+            self.version += 1
+            self._snapshot_stale = True
+            _LOGGER.debug(
+                "HDO dataset v%s loaded from snapshot saved %s",
+                self.version,
+                stored.get("saved"),
+            )
+
+        self.hass.async_create_background_task(
+            self._async_refresh_snapshot(), f"{DOMAIN} dataset refresh"
+        )
+
+    async def _async_refresh_snapshot(self) -> None:
+        """Obnovit data ze snapshotu, pokud je mezitím nestáhla první entry."""
+        async with self._lock:
+            if self._snapshot_stale:
+                await self.async_refresh()
+
+    async def _async_save_snapshot(self) -> None:
+        """Save the current payloads to .storage."""
+        payloads = {
+            key: payload
+            for key, path in SNAPSHOT_PAYLOADS.items()
+            if (payload := self.api.get_cached(self.url(path))) is not None
+        }
+        if len(payloads) != len(SNAPSHOT_PAYLOADS):
+            return
+
+        snapshot = await self.hass.async_add_executor_job(_encode_snapshot, payloads)
+        snapshot["saved"] = dt_util.utcnow().isoformat()
+        if self.regions_updated is not None:
+            snapshot["regions_updated"] = self.regions_updated.isoformat()
+        with self.timings.measure("snapshot"):
+            await self._store.async_save(snapshot)
+
+    async def async_shutdown(self) -> None:
+        """Stop polling and release the HTTP session."""
+        await super().async_shutdown()
+        self.api.session.detach()
+
+    @callback
+    def async_register_entry(
+        self,
+        entry_id: str,
+        region_update_interval: int,
+        psc: str | None = None,
+        hdo_code: str | None = None,
+    ) -> None:
+        """Register an entry with its PSČ table refresh interval (hours).
+
+        `psc` selects the records of its region, `hdo_code` those of a smart
+        meter code in any region.
+        """
+        self._region_intervals[entry_id] = region_update_interval
+        self._selectors[entry_id] = (psc, hdo_code)
+
+    @callback
+    def async_unregister_entry(self, entry_id: str) -> bool:
+        """Unregister an entry, return True when no entries are left."""
+        self._region_intervals.pop(entry_id, None)
+        self._selectors.pop(entry_id, None)
+        return not self._region_intervals
+
+
+def _encode_snapshot(payloads: dict[str, CachedPayload]) -> dict[str, Any]:
+    """Compress payloads for storage (runs in the executor)."""
+    return {
+        key: {
+            "data": base64.b64encode(
+                zlib.compress(json.dumps(payload.data, separators=(",", ":")).encode())
+            ).decode(),
+            "digest": payload.digest,
+            "etag": payload.etag,
+            "last_modified": payload.last_modified,
+            "filter": (
+                None
+                if payload.record_filter is None
+                else [sorted(payload.record_filter.regions), sorted(payload.record_filter.codes)]
+            ),
+        }
+        for key, payload in payloads.items()
+    }
+
+
+def _decode_snapshot(stored: dict[str, Any]) -> dict[str, CachedPayload]:
+    """Decompress payloads from storage (runs in the executor)."""
+    return {
+        key: CachedPayload(
+            data=json.loads(zlib.decompress(base64.b64decode(stored[key]["data"]))),
+            digest=stored[key]["digest"],
+            etag=stored[key]["etag"],
+            last_modified=stored[key]["last_modified"],
+            record_filter=(
+                None
+                if (record_filter := stored[key].get("filter")) is None
+                else RecordFilter(frozenset(record_filter[0]), frozenset(record_filter[1]))
+            ),
+        )
+        for key in SNAPSHOT_PAYLOADS
+    }
+
+
+@callback
+def async_get_dataset(hass: HomeAssistant) -> EGDDistribuceDataset:
+    """Return the shared dataset, creating it on first use."""
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    if (dataset := domain_data.get(DATA_DATASET)) is None:
+        dataset = domain_data[DATA_DATASET] = EGDDistribuceDataset(
+            hass,
+            domain_data.get(DATA_BASE_URL, API_BASE_URL),
+            domain_data.get(DATA_FILTER_RECORDS, True),
+        )
+    return dataset
@@ -0,0 +1,32 @@
+"""Day type (denVTydnu) of calendar dates, with Czech public holidays."""
+from __future__ import annotations
+
+from datetime import date
+
+import holidays
+
+# denVTydnu used on public holidays (Sunday schedule)
+HOLIDAY_DAY_CODE = 7
+
+
+class DayTypeCalendar:
+    """Resolve dates to the denVTydnu code their HDO schedule uses.
+
+    1 = Monday ... 7 = Sunday, public holidays follow the Sunday schedule.
+    Each date is resolved once and shared by all entries.
+    """
+
+    __slots__ = ("_holidays", "_codes")
+
+    def __init__(self, country: str = "CZ") -> None:
+        """Initialize the calendar."""
+        self._holidays = holidays.country_holidays(country)
+        self._codes: dict[date, int] = {}
+
+    def day_code(self, day: date) -> int:
+        """Return the denVTydnu code of the date."""
+        if (code := self._codes.get(day)) is None:
+            code = self._codes[day] = (
+                HOLIDAY_DAY_CODE if day in self._holidays else day.isoweekday()
+            )
+        return code
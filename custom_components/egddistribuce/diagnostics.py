@@ -0,0 +1,61 @@
+"""Diagnostics support for EGD Distribuce."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_DATASET, DOMAIN
+from .coordinator import EGDDistribuceCoordinator
+from .dataset import EGDDistribuceDataset
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: EGDDistribuceCoordinator = hass.data[DOMAIN][entry.entry_id]
+    dataset: EGDDistribuceDataset = hass.data[DOMAIN][DATA_DATASET]
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "region": (coordinator.data or {}).get("region"),
+            "records": coordinator.record_count,
+        },
+        "dataset": {
+            "version": dataset.version,
+            "records": len(dataset.data or []),
+            "records_filter": (
+                None
+                if dataset.records_filter is None
+                else {
+                    "regions": sorted(dataset.records_filter.regions),
+                    "codes": sorted(dataset.records_filter.codes),
+                }
+            ),
+            "psc_regions": len(dataset.psc_regions),
+            "regions_updated": dataset.regions_updated,
+            "region_update_interval": str(dataset.region_update_interval),
+            "update_interval": str(dataset.update_interval),
+            "poll_failures": dataset.polling.failures,
+            "unchanged_polls": dataset.polling.unchanged,
+            "last_update_success": dataset.last_update_success,
+            "last_exception": repr(dataset.last_exception),
+        },
+        "connections": asdict(dataset.api.stats),
+        "payloads": {
+            url: asdict(stats) for url, stats in dataset.api.payload_stats.items()
+        },
+        # Doby kroků v ms: počet, poslední, p50, p95, max
+        "timings": {
+            "dataset": dataset.timings.as_dict(),
+            "coordinator": coordinator.timings.as_dict(),
+        },
+    }
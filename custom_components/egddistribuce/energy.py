@@ -0,0 +1,245 @@
+"""NT/VT energy and cost totals of a power or energy sensor."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import (
+    ATTR_UNIT_OF_MEASUREMENT,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+    UnitOfEnergy,
+    UnitOfPower,
+)
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import ENERGY_SAVE_DELAY, ENERGY_STORAGE_KEY, ENERGY_STORAGE_VERSION
+from .schedule import elapsed
+
+if TYPE_CHECKING:
+    from .coordinator import EGDDistribuceCoordinator
+    from .schedule import HdoTimeline
+
+_LOGGER = logging.getLogger(__name__)
+
+# Source units converted to kWh (energy meters) or kW (power sensors)
+ENERGY_UNITS = {
+    UnitOfEnergy.WATT_HOUR: 0.001,
+    UnitOfEnergy.KILO_WATT_HOUR: 1.0,
+    UnitOfEnergy.MEGA_WATT_HOUR: 1000.0,
+}
+POWER_UNITS = {
+    UnitOfPower.WATT: 0.001,
+    UnitOfPower.KILO_WATT: 1.0,
+}
+KIND_ENERGY = "energy"
+KIND_POWER = "power"
+# Pokles elektroměru pod tento podíl je vynulování, menší je jen oprava
+METER_RESET_RATIO = 0.9
+
+
+def nt_share(timeline: HdoTimeline, start: datetime, end: datetime) -> float:
+    """Return the share of [start, end) in the low tariff.
+
+    Samples are close together, so there is rarely a transition in
+    between and this is a single bisect. Outside the timeline the tariff
+    is not known, so a longer gap (e.g. over a restart) is split by the
+    part of it the timeline covers.
+    """
+    start = max(start, timeline.start)
+    end = min(end, timeline.end)
+    if end <= start:
+        return 1.0 if timeline.state_at(end) else 0.0
+    active = sum(
+        (elapsed(begin, finish) for begin, finish in timeline.active_spans(start, end)),
+        timedelta(),
+    )
+    return active / elapsed(start, end)
+
+
+class EnergyCostMeter:
+    """Running NT/VT totals in kWh and Kč."""
+
+    __slots__ = ("energy_nt", "energy_vt", "cost_nt", "cost_vt")
+
+    def __init__(self) -> None:
+        """Initialize empty totals."""
+        self.energy_nt = 0.0
+        self.energy_vt = 0.0
+        self.cost_nt = 0.0
+        self.cost_vt = 0.0
+
+    @property
+    def cost(self) -> float:
+        """Return the total cost."""
+        return self.cost_nt + self.cost_vt
+
+    def add(self, energy: float, share_nt: float, price_nt: float, price_vt: float) -> None:
+        """Add energy (kWh), share_nt of it consumed in the low tariff."""
+        energy_nt = energy * share_nt
+        energy_vt = energy - energy_nt
+        self.energy_nt += energy_nt
+        self.energy_vt += energy_vt
+        self.cost_nt += energy_nt * price_nt
+        self.cost_vt += energy_vt * price_vt
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the totals for storage."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore the totals from storage."""
+        for name in self.__slots__:
+            setattr(self, name, float(data.get(name, 0.0)))
+
+
+class EnergyCostTracker:
+    """Account every sample of the source sensor to NT or VT.
+
+    Power samples (W, kW) are integrated as held until the next sample,
+    energy meters (Wh, kWh, MWh) contribute their increase; a drop by more
+    than 10% is a meter reset, a smaller one a correction that only moves
+    the baseline, like in the HA statistics. The energy between two samples
+    is split by the coordinator's timeline, so each sample is O(1) work.
+    Totals are stored in .storage; the last energy reading is kept too, so
+    consumption during a restart is not lost.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: EGDDistribuceCoordinator,
+        entry_id: str,
+        source: str,
+    ) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.source = source
+        self.meter = EnergyCostMeter()
+        self._store: Store[dict[str, Any]] = Store(
+            hass, ENERGY_STORAGE_VERSION, f"{ENERGY_STORAGE_KEY}.{entry_id}"
+        )
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsub_source: CALLBACK_TYPE | None = None
+        # Poslední vzorek: druh, hodnota (kW nebo kWh) a čas
+        self._kind: str | None = None
+        self._last_value: float | None = None
+        self._last_time: datetime | None = None
+        self._warned_unit: str | None = None
+
+    async def async_start(self) -> None:
+        """Restore the totals and follow the source sensor."""
+        if (stored := await self._store.async_load()) is not None:
+            self.meter.restore(stored)
+            # Výkon se přes restart neintegruje, stav elektroměru ano
+            if stored.get("source") == self.source and stored.get("kind") == KIND_ENERGY:
+                self._kind = KIND_ENERGY
+                self._last_value = stored.get("last_value")
+                self._last_time = dt_util.parse_datetime(stored.get("last_time") or "")
+
+        self._unsub_source = async_track_state_change_event(
+            self.hass, [self.source], self._async_source_changed
+        )
+        if (state := self.hass.states.get(self.source)) is not None:
+            self._async_sample(state.state, state.attributes, state.last_updated)
+
+    async def async_shutdown(self) -> None:
+        """Stop following the source and write the totals."""
+        if self._unsub_source is not None:
+            self._unsub_source()
+            self._unsub_source = None
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call update_callback whenever the totals change."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _remove
+
+    @callback
+    def _async_source_changed(self, event: Event) -> None:
+        """Handle a new state of the source sensor."""
+        if (state := event.data.get("new_state")) is None:
+            return
+        self._async_sample(state.state, state.attributes, state.last_updated)
+
+    @callback
+    def _async_sample(self, value: str, attributes: Any, when: datetime) -> None:
+        """Zaúčtovat jeden vzorek zdrojového senzoru."""
+        if value in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            # Výpadek výkonu nelze integrovat, elektroměr pokračuje od poslední hodnoty
+            if self._kind == KIND_POWER:
+                self._last_value = None
+            return
+
+        unit = attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+        if unit in ENERGY_UNITS:
+            kind, factor = KIND_ENERGY, ENERGY_UNITS[unit]
+        elif unit in POWER_UNITS:
+            kind, factor = KIND_POWER, POWER_UNITS[unit]
+        else:
+            if unit != self._warned_unit:
+                _LOGGER.warning(
+                    "%s has unit %s, expected W, kW, Wh, kWh or MWh", self.source, unit
+                )
+                self._warned_unit = unit
+            return
+        try:
+            current = float(value) * factor
+        except ValueError:
+            return
+
+        last_kind, last_value, last_time = self._kind, self._last_value, self._last_time
+        self._kind, self._last_value, self._last_time = kind, current, when
+        if kind != last_kind or last_value is None or last_time is None:
+            return
+        if (timeline := self.coordinator.timeline) is None:
+            return
+
+        if kind == KIND_POWER:
+            energy = last_value * (when - last_time).total_seconds() / 3600
+        else:
+            energy = current - last_value
+            if energy < 0 and current < last_value * METER_RESET_RATIO:
+                # Vynulovaný elektroměr
+                energy = current
+        if energy <= 0:
+            return
+
+        self.meter.add(
+            energy,
+            nt_share(timeline, last_time, when),
+            self.coordinator.price_nt,
+            self.coordinator.price_vt,
+        )
+        self._store.async_delay_save(self._data_to_save, ENERGY_SAVE_DELAY)
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the totals and the last energy reading for storage."""
+        return {
+            **self.meter.as_dict(),
+            "source": self.source,
+            "kind": self._kind,
+            "last_value": self._last_value,
+            "last_time": self._last_time.isoformat() if self._last_time else None,
+        }
+
+
+async def async_remove_energy_totals(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the stored totals of a removed entry."""
+    await Store(
+        hass, ENERGY_STORAGE_VERSION, f"{ENERGY_STORAGE_KEY}.{entry_id}"
+    ).async_remove()
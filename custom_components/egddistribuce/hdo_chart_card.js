@@ -1,5 +1,6 @@
 class HdoChartCard extends HTMLElement {
   set hass(hass) {
+    this._hass = hass;
     if (!this.content) {
       const card = document.createElement('ha-card');
       // Nastavit header pouze pokud show_header není false
@@ -16,41 +17,204 @@ class HdoChartCard extends HTMLElement {
     const stateObj = hass.states[entityId];
     
     if (!stateObj) {
-      this.content.innerHTML = `<p>Entity ${entityId} not found</p>`;
+      this._showMessage(`<p>Entity ${entityId} not found</p>`);
       return;
     }
 
+    // Rozvrh přes websocket - stáhne se jen při změně schedule_version
+    const version = stateObj.attributes.schedule_version;
+    if (version && !this._wsFailed) {
+      if (version !== this._scheduleVersion) {
+        this._fetchSchedule(hass, entityId, version);
+      }
+      if (!this._schedule) {
+        this._showMessage('<p>Načítání rozvrhu...</p>');
+        return;
+      }
+      const schedule = this._schedule;
+      const showDays = this.config.show_days || 1;
+      this._update([schedule, showDays], schedule.spans, () => this._renderChart(
+        [], showDays, schedule, schedule.spans
+      ));
+      return;
+    }
 
     const hdoHourly = stateObj.attributes['HDO_HOURLY'] 
                    || stateObj.attributes['HDO HOURLY']
                    || stateObj.attributes['hdo_hourly'];
     
     if (!hdoHourly) {
-      this.content.innerHTML = '<p>HDO_HOURLY attribute not found</p>';
+      this._showMessage('<p>HDO_HOURLY attribute not found</p>');
       return;
     }
     
 
     if (typeof hdoHourly === 'string') {
-      this.content.innerHTML = '<p>HDO_HOURLY is a string, not an object. Check binary_sensor.py</p>';
+      this._showMessage('<p>HDO_HOURLY is a string, not an object. Check binary_sensor.py</p>');
       return;
     }
     
     if (typeof hdoHourly !== 'object') {
-      this.content.innerHTML = `<p>HDO_HOURLY has unexpected type: ${typeof hdoHourly}</p>`;
+      this._showMessage(`<p>HDO_HOURLY has unexpected type: ${typeof hdoHourly}</p>`);
       return;
     }
     
     const keys = Object.keys(hdoHourly);
     if (keys.length === 0) {
-      this.content.innerHTML = '<p>HDO_HOURLY is empty (no data)</p>';
+      this._showMessage('<p>HDO_HOURLY is empty (no data)</p>');
       return;
     }
 
-    const hdoData = this._parseHdoData(hdoHourly);
+    // Kompaktní formát: [[začátek, konec, "NT"/"VT"], ...]
+    const spans = Array.isArray(hdoHourly) ? hdoHourly : null;
     const showDays = this.config.show_days || 1; 
-    
-    this.content.innerHTML = this._renderChart(hdoData, showDays, stateObj.attributes);
+    const attributes = stateObj.attributes;
+    
+    // Nezměněné atributy si HA frontend drží jako tytéž objekty
+    this._update(
+      [
+        hdoHourly,
+        attributes.hdo_times_today_raw,
+        attributes.hdo_times_tomorrow_raw,
+        attributes.region,
+        attributes.price_vt,
+        attributes.price_nt,
+        attributes.color_vt,
+        attributes.color_nt,
+        showDays
+      ],
+      spans,
+      () => this._renderChart(
+        spans ? [] : this._parseHdoData(hdoHourly), showDays, attributes, spans
+      )
+    );
+  }
+
+  _update(inputs, spans, render) {
+    // Zbývající čas se počítá z úseků rozvrhu; starší integrace ho posílá v atributu
+    this._spans = spans;
+    this._remainingAttr = this._hass.states[this.config.entity].attributes.remaining_time;
+    // Celý graf jen při změně dat nebo dne, jinak jen zbývající čas
+    inputs = [...inputs, new Date().toDateString()];
+    if (this._sameInputs(inputs)) {
+      this._updateRemaining();
+      return;
+    }
+    this._inputs = inputs;
+    this.content.innerHTML = render();
+    this._remainingEl = this.content.querySelector('.hdo-remaining');
+    this._cursorEl = this.content.querySelector('.hdo-now');
+    if (this.isConnected && !this._timer) {
+      this._scheduleTick();
+    }
+  }
+
+  _sameInputs(inputs) {
+    const previous = this._inputs;
+    return !!previous
+      && previous.length === inputs.length
+      && previous.every((value, i) => value === inputs[i]);
+  }
+
+  _showMessage(html) {
+    this._inputs = null;
+    this._remainingEl = null;
+    this._cursorEl = null;
+    this.content.innerHTML = html;
+  }
+
+  connectedCallback() {
+    if (this._inputs) {
+      this._tick();
+    }
+  }
+
+  disconnectedCallback() {
+    clearTimeout(this._timer);
+    this._timer = null;
+  }
+
+  _scheduleTick() {
+    // Na začátek další minuty
+    clearTimeout(this._timer);
+    const now = new Date();
+    const delay = 60000 - now.getSeconds() * 1000 - now.getMilliseconds();
+    this._timer = setTimeout(() => this._tick(), delay);
+  }
+
+  _tick() {
+    clearTimeout(this._timer);
+    this._timer = null;
+    if (!this.isConnected) {
+      return;
+    }
+    const inputs = this._inputs;
+    if (inputs && inputs[inputs.length - 1] !== new Date().toDateString()) {
+      // Po půlnoci je zítřek dnes - celý graf znovu
+      this.hass = this._hass;
+    } else {
+      this._moveCursor();
+      this._updateRemaining();
+    }
+    if (!this._timer) {
+      this._scheduleTick();
+    }
+  }
+
+  _moveCursor() {
+    if (!this._cursorEl) {
+      return;
+    }
+    const now = new Date();
+    const currentHour = now.getHours() + now.getMinutes() / 60;
+    this._cursorEl.style.left = `${(currentHour / 24) * 100}%`;
+    this._cursorEl.title = `Aktuální čas: ${this._formatHour(currentHour)}`;
+  }
+
+  _updateRemaining() {
+    if (this._remainingEl) {
+      this._remainingEl.textContent = this._remainingText();
+    }
+  }
+
+  _remainingText() {
+    return `Další změna za: ${this._remainingTime() || '-'}`;
+  }
+
+  _remainingTime() {
+    if (!this._spans) {
+      return this._remainingAttr;
+    }
+    const now = Date.now();
+    const index = this._spans.findIndex(
+      ([start, end]) => new Date(start).getTime() <= now && now < new Date(end).getTime()
+    );
+    // Za koncem rozvrhu další změna není známá
+    if (index < 0 || index === this._spans.length - 1) {
+      return 'N/A';
+    }
+    const minutes = Math.floor((new Date(this._spans[index][1]).getTime() - now) / 60000);
+    return `${Math.floor(minutes / 60)}:${(minutes % 60).toString().padStart(2, '0')}`;
+  }
+
+  async _fetchSchedule(hass, entityId, version) {
+    // Jen jeden požadavek na verzi, i když hass přijde vícekrát
+    this._scheduleVersion = version;
+    try {
+      const result = await hass.callWS({
+        type: 'egddistribuce/schedule',
+        entity_id: entityId,
+        version: this._schedule ? this._schedule.version : undefined
+      });
+      if (result.spans) {
+        this._schedule = result;
+      }
+    } catch (err) {
+      // Starší integrace bez websocketu - zpět na atributy entity
+      console.error('HDO schedule not available:', err);
+      this._wsFailed = true;
+    }
+    this.hass = this._hass;
   }
 
   _parseHdoData(hdoHourly) {
@@ -70,22 +234,59 @@ class HdoChartCard extends HTMLElement {
     return entries;
   }
 
-  _renderChart(hdoData, showDays, attributes) {
+  _slotsFromSpans(spans, day) {
+    const dayStart = day.getTime();
+    const nextDay = new Date(day);
+    nextDay.setDate(nextDay.getDate() + 1);
+    const dayEnd = nextDay.getTime();
+    
+    const slots = [];
+    for (const [start, end, tariff] of spans) {
+      if (tariff !== 'NT') {
+        continue;
+      }
+      const from = Math.max(new Date(start).getTime(), dayStart);
+      const to = Math.min(new Date(end).getTime(), dayEnd);
+      if (from >= to) {
+        continue;
+      }
+      slots.push({
+        od: this._formatClock(from),
+        do: to >= dayEnd ? '23:59:00' : this._formatClock(to)
+      });
+    }
+    
+    return slots;
+  }
+
+  _formatClock(ms) {
+    const dt = new Date(ms);
+    const h = dt.getHours().toString().padStart(2, '0');
+    const m = dt.getMinutes().toString().padStart(2, '0');
+    return `${h}:${m}:00`;
+  }
+
+  _renderChart(hdoData, showDays, attributes, spans = null) {
     const priceVt = parseFloat(attributes.price_vt || 7.0);
     const priceNt = parseFloat(attributes.price_nt || 3.0);
     const colorVt = attributes.color_vt || '#ff5252';
     const colorNt = attributes.color_nt || '#2196f3';
-    
-    const remainingTime = attributes.remaining_time || '-';
 
-    const hdoTimesToday = attributes.hdo_times_today_raw || [];
-    const hdoTimesTomorrow = attributes.hdo_times_tomorrow_raw || [];
     const region = attributes.region || '';
     const isTou = region === 'TOU';
     
     const today = new Date();
     today.setHours(0, 0, 0, 0);
     
+    let hdoTimesToday = attributes.hdo_times_today_raw || [];
+    let hdoTimesTomorrow = attributes.hdo_times_tomorrow_raw || [];
+    if (spans) {
+      const tomorrow = new Date(today);
+      tomorrow.setDate(tomorrow.getDate() + 1);
+      hdoTimesToday = this._slotsFromSpans(spans, today);
+      hdoTimesTomorrow = this._slotsFromSpans(spans, tomorrow);
+    }
+    
     let html = '<div style="width: 100%;">';
     
 
@@ -120,7 +321,7 @@ class HdoChartCard extends HTMLElement {
       `;
     }
     
-    html += this._renderLegend(priceVt, priceNt, colorVt, colorNt, remainingTime);
+    html += this._renderLegend(priceVt, priceNt, colorVt, colorNt);
     html += '</div>';
     
     return html;
@@ -265,7 +466,7 @@ class HdoChartCard extends HTMLElement {
       const currentPosition = (currentHour / 24) * 100;
       
       html += `
-        <div style="
+        <div class="hdo-now" style="
           position: absolute;
           left: ${currentPosition}%;
           top: 0;
@@ -382,7 +583,7 @@ class HdoChartCard extends HTMLElement {
       const currentPosition = (currentHour / 24) * 100;
       
       html += `
-        <div style="
+        <div class="hdo-now" style="
           position: absolute;
           left: ${currentPosition}%;
           top: 0;
@@ -419,7 +620,7 @@ class HdoChartCard extends HTMLElement {
     return `${h}:${m.toString().padStart(2, '0')}`;
   }
 
-  _renderLegend(priceVt, priceNt, colorVt, colorNt, remainingTime) {
+  _renderLegend(priceVt, priceNt, colorVt, colorNt) {
     return `
       <div style="display: flex; gap: 16px; margin-top: 16px; padding-top: 16px; border-top: 1px solid var(--divider-color); font-size: 12px;">
         <div style="display: flex; align-items: center; gap: 6px;">
@@ -432,7 +633,7 @@ class HdoChartCard extends HTMLElement {
         </div>
         <div style="display: flex; align-items: center; gap: 6px;">
          
-          <span>Další změna za: ${remainingTime}</span>
+          <span class="hdo-remaining">${this._remainingText()}</span>
         </div>
       </div>
     `;
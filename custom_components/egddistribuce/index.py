@@ -0,0 +1,265 @@
+"""Lookup indexes over the HDO dataset."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, timedelta
+import logging
+from typing import Any, NamedTuple
+
+from .models import HdoRecord, ValidityBound
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def normalize_dp(dp: Any) -> str:
+    """Normalise a DP code so '1', '01' and '001' are the same key."""
+    dp = str(dp).strip()
+    return str(int(dp)) if dp.isdigit() else dp
+
+
+def build_psc_index(regions: list[dict[str, Any]]) -> dict[str, str]:
+    """Map PSČ to region from the /region payload (first match wins)."""
+    psc_regions: dict[str, str] = {}
+    for record in regions:
+        psc_regions.setdefault(record.get('PSC'), record.get('Region'))
+    return psc_regions
+
+
+class RecordFilter(NamedTuple):
+    """Records any configured entry can use: by region or by HDO code.
+
+    Applied while /casy is decoded, so records of other regions are never
+    kept. Hashable, so the cached payload remembers what it was filtered by.
+    """
+
+    regions: frozenset[str] = frozenset()
+    codes: frozenset[str] = frozenset()
+
+    def __call__(self, record: dict[str, Any]) -> bool:
+        """Return True if the record is wanted."""
+        return record.get('region') in self.regions or record.get('kodHdo_A') in self.codes
+
+    def covers(self, other: RecordFilter) -> bool:
+        """Return True if every record `other` wants is wanted here too."""
+        return other.regions <= self.regions and other.codes <= self.codes
+
+
+class HdoRecordIndex:
+    """HDO records indexed by everything the config types filter on.
+
+    Built once per downloaded dataset and shared by all entries, so every
+    lookup is a dict access instead of a scan over all records. Records are
+    converted to HdoRecord on their first lookup, so only the records some
+    entry matches are ever converted; malformed ones are left out.
+    """
+
+    __slots__ = (
+        "_by_classic",
+        "_by_region_code",
+        "_by_code",
+        "_models",
+        "_lists",
+        "_interned",
+        "size",
+    )
+
+    def __init__(self, records: list[dict[str, Any]]) -> None:
+        """Index the records."""
+        by_classic: dict[tuple, list] = defaultdict(list)
+        by_region_code: dict[tuple, list] = defaultdict(list)
+        by_code: dict[Any, list] = defaultdict(list)
+
+        for record in records:
+            region = record.get('region')
+            code = record.get('kodHdo_A')
+            by_classic[
+                (region, record.get('A'), record.get('B'), normalize_dp(record.get('DP')))
+            ].append(record)
+            by_region_code[(region, code)].append(record)
+            by_code[code].append(record)
+
+        self._by_classic = dict(by_classic)
+        self._by_region_code = dict(by_region_code)
+        self._by_code = dict(by_code)
+        # Převedené záznamy (podle id původního dictu) a sdílené sloty
+        self._models: dict[int, HdoRecord | None] = {}
+        self._lists: dict[tuple, list[HdoRecord]] = {}
+        self._interned: dict[tuple, tuple] = {}
+        self.size = len(records)
+
+    def _lookup(self, table: str, key: Any) -> list[HdoRecord]:
+        """Return the converted records of a key in one of the tables."""
+        if (models := self._lists.get((table, key))) is None:
+            records = getattr(self, table).get(key, [])
+            models = self._lists[(table, key)] = self._convert(records)
+        return models
+
+    def _convert(self, records: list[dict[str, Any]]) -> list[HdoRecord]:
+        """Return the records as HdoRecord, converting each one only once."""
+        models = []
+        for record in records:
+            key = id(record)
+            if key in self._models:
+                model = self._models[key]
+            else:
+                try:
+                    model = HdoRecord.from_dict(record, self._interned)
+                except (AttributeError, KeyError, TypeError, ValueError):
+                    _LOGGER.warning("Skipping malformed HDO record: %s", record)
+                    model = None
+                self._models[key] = model
+            if model is not None:
+                models.append(model)
+        return models
+
+    def classic(self, region: str, code_a: str, code_b: str, code_dp: str) -> list[HdoRecord]:
+        """Records for region + A + B + DP."""
+        return self._lookup(
+            "_by_classic", (region, code_a, code_b, normalize_dp(code_dp))
+        )
+
+    def region_code(self, region: str, code: str) -> list[HdoRecord]:
+        """Records for region + HDO command code (kodHdo_A)."""
+        return self._lookup("_by_region_code", (region, code))
+
+    def code(self, code: str) -> list[HdoRecord]:
+        """Records for a HDO code in any region (smart meters)."""
+        return self._lookup("_by_code", code)
+
+
+# Rok v "od", kterým API značí každoročně se opakující období
+RECURRING_YEAR = 9999
+
+
+class ValidityBoundaries:
+    """Dates on which some record starts or stops being valid.
+
+    Recurring seasons switch on the first day of a month every year, dated
+    records on their first day and the day after their last one.
+    """
+
+    __slots__ = ("_months", "_dates")
+
+    def __init__(self, records: list[dict[str, Any]]) -> None:
+        """Collect the boundaries of the records."""
+        months: set[int] = set()
+        dates: set[date] = set()
+        for record in records:
+            try:
+                start = ValidityBound.from_dict(record['od'])
+                end = ValidityBound.from_dict(record['do'])
+                if start.year == RECURRING_YEAR:
+                    months.add(start.month)
+                    months.add(end.month % 12 + 1)
+                    continue
+                end_year = end.year + 1 if end.year < start.year else end.year
+                dates.add(date(start.year, start.month, start.day))
+                dates.add(date(end_year, end.month, end.day) + timedelta(days=1))
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+        self._months = frozenset(months)
+        self._dates = sorted(dates)
+
+    def previous(self, day: date) -> date | None:
+        """Last boundary on or before the day."""
+        candidates = []
+        if (i := bisect_right(self._dates, day)) > 0:
+            candidates.append(self._dates[i - 1])
+        if self._months:
+            year, month = day.year, day.month
+            while month not in self._months:
+                year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+            candidates.append(date(year, month, 1))
+        return max(candidates, default=None)
+
+    def next(self, day: date) -> date | None:
+        """First boundary after the day."""
+        candidates = []
+        if (i := bisect_right(self._dates, day)) < len(self._dates):
+            candidates.append(self._dates[i])
+        if self._months:
+            year, month = day.year, day.month
+            while True:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                if month in self._months:
+                    break
+            candidates.append(date(year, month, 1))
+        return min(candidates, default=None)
+
+
+class ValidityIndex:
+    """An entry's records by the dates they are valid on.
+
+    Each record's validity is resolved once: recurring seasons (year 9999)
+    to the months they cover, dated records to a (first, last) date range.
+    The dated ranges are cut into sorted segments holding the records valid
+    throughout them, so the records valid on a date are one bisect away and
+    any day of the horizon is answered without re-checking every record.
+    """
+
+    __slots__ = ("records", "_bounds", "_segments", "_by_month", "_cache")
+
+    def __init__(self, records: list[HdoRecord]) -> None:
+        """Resolve the validity of the records."""
+        self.records = records
+        by_month: dict[int, list[int]] = {month: [] for month in range(1, 13)}
+        ranges: list[tuple[date, date, int]] = []
+
+        for position, record in enumerate(records):
+            start, end = record.valid_from, record.valid_to
+            if start.year == RECURRING_YEAR:
+                # Období se opakuje každý rok, např. 4-9 nebo přes rok 10-3
+                if start.month <= end.month:
+                    months = range(start.month, end.month + 1)
+                else:
+                    months = [*range(start.month, 13), *range(1, end.month + 1)]
+                for month in months:
+                    by_month[month].append(position)
+                continue
+
+            # Konec v dřívějším roce než začátek = období přes Nový rok
+            end_year = end.year + 1 if end.year < start.year else end.year
+            try:
+                first = date(start.year, start.month, start.day)
+                last = date(end_year, end.month, end.day)
+            except ValueError:
+                _LOGGER.warning(
+                    "Ignoring HDO record with invalid validity %s - %s", start, end
+                )
+                continue
+            if first <= last:
+                ranges.append((first, last, position))
+
+        # Hranice segmentů: začátky platnosti a dny po jejich koncích
+        bounds = sorted(
+            {first for first, _, _ in ranges}
+            | {last + timedelta(days=1) for _, last, _ in ranges}
+        )
+        self._bounds = bounds
+        self._segments = [
+            tuple(
+                position
+                for first, last, position in ranges
+                if first <= bound <= last
+            )
+            for bound in bounds
+        ]
+        self._by_month = {month: tuple(x) for month, x in by_month.items()}
+        self._cache: dict[tuple[int, int], tuple[HdoRecord, ...]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self.records)
+
+    def records_on(self, day: date) -> tuple[HdoRecord, ...]:
+        """Records valid on the day, in their original order."""
+        segment = bisect_right(self._bounds, day) - 1
+        key = (segment, day.month)
+        if (records := self._cache.get(key)) is None:
+            dated = self._segments[segment] if segment >= 0 else ()
+            records = self._cache[key] = tuple(
+                self.records[position]
+                for position in sorted(dated + self._by_month[day.month])
+            )
+        return records
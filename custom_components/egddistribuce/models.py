@@ -0,0 +1,96 @@
+"""Compact HDO records, converted once from the API's nested dicts."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+from .schedule import slot_interval
+
+
+class HdoSlot(NamedTuple):
+    """One switching slot: the API times and the interval in minutes."""
+
+    od: str
+    do: str
+    start: int
+    end: int
+
+
+class ValidityBound(NamedTuple):
+    """Start or end of a record's validity (year 9999 = every year)."""
+
+    year: int
+    month: int
+    day: int
+
+    @classmethod
+    def from_dict(cls, bound: dict[str, Any]) -> ValidityBound:
+        """Convert an API {'rok', 'mesic', 'den'} bound."""
+        return cls(int(bound['rok']), int(bound['mesic']), int(bound.get('den', 1)))
+
+
+@dataclass(slots=True, frozen=True)
+class HdoRecord:
+    """An HDO record with its slots grouped by day code (denVTydnu).
+
+    Built once per downloaded dataset, so refreshes only look slots up.
+    """
+
+    region: str | None
+    code: str | None
+    valid_from: ValidityBound
+    valid_to: ValidityBound
+    days: dict[int, tuple[HdoSlot, ...]]
+
+    @classmethod
+    def from_dict(
+        cls,
+        record: dict[str, Any],
+        interned: dict[tuple, tuple[HdoSlot, ...]] | None = None,
+    ) -> HdoRecord:
+        """Convert an API record.
+
+        Identical slot lists (most days and records share a few) are parsed
+        and stored once when an `interned` dict is shared across conversions.
+        Raises AttributeError, KeyError, TypeError or ValueError on a
+        malformed record.
+        """
+        if interned is None:
+            interned = {}
+        days: dict[int, tuple[HdoSlot, ...]] = {}
+        for sazba in record.get('sazby', []):
+            for day_rule in sazba.get('dny', []):
+                day_code = int(day_rule['denVTydnu'])
+                casy = day_rule.get('casy', [])
+                key = tuple((cas.get('od'), cas.get('do')) for cas in casy)
+                if (slots := interned.get(key)) is None:
+                    slots = interned[key] = _parse_slots(key)
+                days[day_code] = days[day_code] + slots if day_code in days else slots
+
+        return cls(
+            region=record.get('region'),
+            code=record.get('kodHdo_A'),
+            valid_from=ValidityBound.from_dict(record['od']),
+            valid_to=ValidityBound.from_dict(record['do']),
+            days=days,
+        )
+
+    def slots(self, day_code: int) -> tuple[HdoSlot, ...]:
+        """Slots of the day code."""
+        return self.days.get(day_code, ())
+
+
+def _parse_slots(times: tuple[tuple[str, str], ...]) -> tuple[HdoSlot, ...]:
+    """Parse (od, do) pairs, skipping malformed ones."""
+    return tuple(slot for od, do in times if (slot := _parse_slot(od, do)) is not None)
+
+
+@lru_cache(maxsize=4096)
+def _parse_slot(od: str, do: str) -> HdoSlot | None:
+    """Parse one (od, do) pair; the API uses only a few distinct times."""
+    try:
+        start, end = slot_interval(od, do)
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return HdoSlot(od, do, start, end)
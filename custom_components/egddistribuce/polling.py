@@ -0,0 +1,75 @@
+"""Adaptive poll interval of the shared HDO dataset."""
+from __future__ import annotations
+
+from datetime import timedelta
+import random
+
+
+class AdaptivePolling:
+    """Choose the delay before the next download.
+
+    - errors back off exponentially from `retry` up to `base`
+    - every identical payload in a row doubles `base`, up to `maximum`
+    - within `window` of a date records start or expire, `boundary` is used,
+      and a longer interval is cut short to reach that window
+    - every interval is spread by +-`jitter` with a per-instance random
+      generator, so installations do not poll the server in sync
+    """
+
+    def __init__(
+        self,
+        base: timedelta,
+        maximum: timedelta,
+        boundary: timedelta,
+        window: timedelta,
+        retry: timedelta,
+        jitter: float = 0.0,
+        rnd: random.Random | None = None,
+    ) -> None:
+        """Initialize the policy."""
+        self.base = base
+        self.maximum = maximum
+        self.boundary = boundary
+        self.window = window
+        self.retry = retry
+        self.jitter = jitter
+        self.failures = 0
+        self.unchanged = 0
+        self._rnd = rnd or random.Random()
+
+    def failed(self) -> timedelta:
+        """Interval after a failed download."""
+        self.failures += 1
+        interval = min(self.retry * 2 ** (self.failures - 1), self.base)
+        return self._spread(interval)
+
+    def succeeded(
+        self,
+        changed: bool,
+        since_boundary: timedelta | None = None,
+        until_boundary: timedelta | None = None,
+    ) -> timedelta:
+        """Interval after a successful download.
+
+        `since_boundary` / `until_boundary` are the time from the previous
+        and to the next date on which some record starts or expires.
+        """
+        self.failures = 0
+        self.unchanged = 0 if changed else self.unchanged + 1
+        # Bez 2**n přetečení - po pár stejných odpovědích je to stejně maximum
+        interval = min(self.base * 2 ** min(self.unchanged, 8), self.maximum)
+
+        if (since_boundary is not None and since_boundary <= self.window) or (
+            until_boundary is not None and until_boundary <= self.window
+        ):
+            interval = min(interval, self.boundary)
+        elif until_boundary is not None and until_boundary - self.window < interval:
+            # Dorazit právě do okna kolem hranice
+            interval = max(until_boundary - self.window, self.boundary)
+        return self._spread(interval)
+
+    def _spread(self, interval: timedelta) -> timedelta:
+        """Apply the jitter."""
+        if not self.jitter:
+            return interval
+        return interval * self._rnd.uniform(1 - self.jitter, 1 + self.jitter)
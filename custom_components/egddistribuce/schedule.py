@@ -0,0 +1,258 @@
+"""HDO time slots compiled to integer minutes of the day."""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+
+# (start, end) in minutes of the day, end exclusive
+Interval = tuple[int, int]
+
+
+def parse_minute(value: str) -> int:
+    """Convert 'HH:MM[:SS]' to minutes since midnight."""
+    hours, minutes = value.split(':')[:2]
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time: {value}")
+    return hours * 60 + minutes
+
+
+def slot_interval(od: str, do: str) -> Interval:
+    """Convert one API slot to an (start, end) interval in minutes.
+
+    The API closes slots one minute early: '06:59:00' means until 07:00 and
+    '23:59:00' until the end of the day. This is resolved here, once, so
+    the intervals can be compared with plain integers.
+    """
+    start = parse_minute(od)
+    end = parse_minute(do)
+    # Konec :59 = začátek další hodiny (23:59 = konec dne)
+    if end % 60 == 59:
+        end += 1
+    return start, end
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+    """Sort and merge intervals, dropping empty ones."""
+    merged: list[Interval] = []
+    for start, end in sorted(x for x in intervals if x[0] < x[1]):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def elapsed(start: datetime, end: datetime) -> timedelta:
+    """Return the real time from start to end.
+
+    Aware datetimes in one zone subtract as wall clocks, which is an hour
+    off across a DST change; taken in UTC the difference is exact.
+    """
+    return end.astimezone(timezone.utc) - start.astimezone(timezone.utc)
+
+
+class HdoTimeline:
+    """HDO state over consecutive days as sorted transition points.
+
+    Built from the compiled intervals of each day starting at `start`.
+    Slots running over midnight are joined, so a transition is only ever
+    a real change of state. Lookups bisect the transition times.
+    """
+
+    __slots__ = ("start", "end", "initial", "_times", "_states")
+
+    def __init__(
+        self,
+        start: date,
+        days: list[list[Interval]],
+        tz: tzinfo | None = None,
+    ) -> None:
+        """Build the timeline from per-day intervals."""
+        midnight = datetime.combine(start, time(), tz)
+        self.start = midnight
+        self.end = midnight + timedelta(days=len(days))
+        self.initial = False
+        times: list[datetime] = []
+        states: list[bool] = []
+
+        for offset, intervals in enumerate(days):
+            day_start = midnight + timedelta(days=offset)
+            for slot_start, slot_end in intervals:
+                begin = day_start + timedelta(minutes=slot_start)
+                if begin == self.start:
+                    self.initial = True
+                elif times and times[-1] == begin:
+                    # Navazuje na slot předchozího dne - není to změna
+                    times.pop()
+                    states.pop()
+                else:
+                    times.append(begin)
+                    states.append(True)
+                finish = day_start + timedelta(minutes=slot_end)
+                if finish < self.end:
+                    times.append(finish)
+                    states.append(False)
+
+        self._times = times
+        self._states = states
+
+    def __len__(self) -> int:
+        """Return the number of transitions."""
+        return len(self._times)
+
+    def state_at(self, moment: datetime) -> bool:
+        """Return True if HDO is active at the moment.
+
+        Beyond the end of the timeline the last known state holds.
+        """
+        i = bisect_right(self._times, moment)
+        return self._states[i - 1] if i else self.initial
+
+    def next_transition(self, moment: datetime) -> tuple[datetime, bool] | None:
+        """Return (time, new state) of the first change after the moment."""
+        i = bisect_right(self._times, moment)
+        if i < len(self._times):
+            return self._times[i], self._states[i]
+        return None
+
+    def iter_transitions(
+        self, start: datetime, end: datetime
+    ) -> Iterator[tuple[datetime, bool]]:
+        """Yield (time, new state) of the changes in [start, end)."""
+        i = bisect_left(self._times, start)
+        while i < len(self._times) and self._times[i] < end:
+            yield self._times[i], self._states[i]
+            i += 1
+
+    def next_active(self, moment: datetime) -> tuple[datetime, datetime | None] | None:
+        """Return (start, end) of the first active span starting after the moment.
+
+        The end is None when the span runs past the end of the timeline.
+        """
+        i = bisect_right(self._times, moment)
+        while i < len(self._times) and not self._states[i]:
+            i += 1
+        if i == len(self._times):
+            return None
+        end = self._times[i + 1] if i + 1 < len(self._times) else None
+        return self._times[i], end
+
+    def active_spans(
+        self, start: datetime, end: datetime
+    ) -> Iterator[tuple[datetime, datetime]]:
+        """Yield (start, end) of the active spans clipped to [start, end)."""
+        begin = start if self.state_at(start) else None
+        for moment, state in self.iter_transitions(start, end):
+            if state:
+                if begin is None:
+                    begin = moment
+            elif begin is not None:
+                if moment > begin:
+                    yield begin, moment
+                begin = None
+        if begin is not None and begin < end:
+            yield begin, end
+
+
+# (start, end) of one span in time
+Span = tuple[datetime, datetime]
+
+
+class _ActiveTime:
+    """Active time in [origin, t) for non-decreasing t, in one pass over spans."""
+
+    __slots__ = ("_spans", "_i", "_done")
+
+    def __init__(self, spans: list[Span]) -> None:
+        """Initialize at the start of the spans."""
+        self._spans = spans
+        self._i = 0
+        self._done = timedelta()
+
+    def until(self, moment: datetime) -> timedelta:
+        """Return the active time before the moment."""
+        spans = self._spans
+        while self._i < len(spans) and spans[self._i][1] <= moment:
+            self._done += spans[self._i][1] - spans[self._i][0]
+            self._i += 1
+        if self._i < len(spans) and spans[self._i][0] < moment:
+            return self._done + (moment - spans[self._i][0])
+        return self._done
+
+
+def best_window(
+    spans: list[Span], start: datetime, end: datetime, duration: timedelta
+) -> tuple[datetime, timedelta]:
+    """Return (start, active time) of the contiguous window with most active time.
+
+    `spans` are the sorted, disjoint active spans within [start, end) and
+    the window must fit in it. The optimum starts at `start`, at the start
+    of a span, ends at the end of a span or at `end`; the candidate lists
+    are already sorted, so they are merged and evaluated in one linear
+    pass.
+    The earliest of equally good windows wins.
+    """
+    latest = end - duration
+    candidates = [start]
+    candidates.extend(x[0] for x in spans)
+    candidates.extend(x[1] - duration for x in spans)
+    # Dva seřazené seznamy - sort je na nich lineární (timsort)
+    candidates[1:] = sorted(candidates[1:])
+    candidates.append(latest)
+
+    begin_time = _ActiveTime(spans)
+    end_time = _ActiveTime(spans)
+    best, best_active = start, timedelta(-1)
+    for candidate in candidates:
+        if candidate < start or candidate > latest:
+            continue
+        active = end_time.until(candidate + duration) - begin_time.until(candidate)
+        if active > best_active:
+            best, best_active = candidate, active
+            if active == duration:
+                break
+    return best, best_active
+
+
+def best_split(
+    spans: list[Span], start: datetime, end: datetime, duration: timedelta
+) -> tuple[list[Span], timedelta]:
+    """Return (windows, active time) covering the duration, most active time first.
+
+    Active spans are taken earliest first; when they are not long enough,
+    the rest is filled from the earliest inactive gaps. Touching windows
+    are joined.
+    """
+    windows: list[Span] = []
+    remaining = duration
+    for begin, finish in spans:
+        if remaining <= timedelta():
+            break
+        finish = min(finish, begin + remaining)
+        windows.append((begin, finish))
+        remaining -= finish - begin
+    active = duration - remaining
+
+    if remaining > timedelta():
+        gaps = []
+        moment = start
+        for begin, finish in [*spans, (end, end)]:
+            if remaining <= timedelta():
+                break
+            if moment < begin:
+                gap_end = min(begin, moment + remaining)
+                gaps.append((moment, gap_end))
+                remaining -= gap_end - moment
+            moment = finish
+        windows = sorted(windows + gaps)
+
+    joined: list[Span] = []
+    for begin, finish in windows:
+        if joined and begin <= joined[-1][1]:
+            joined[-1] = (joined[-1][0], max(finish, joined[-1][1]))
+        else:
+            joined.append((begin, finish))
+    return joined, active
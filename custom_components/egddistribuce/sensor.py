@@ -10,16 +10,32 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CURRENCY_EURO
+from homeassistant.const import (
+    CURRENCY_EURO,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import CONF_ENERGY_ENTITY, DOMAIN
 from .coordinator import EGDDistribuceCoordinator
+from .energy import EnergyCostTracker
+from .timing import StageTimings
 
 _LOGGER = logging.getLogger(__name__)
 
+REMOVED_DATASET_SENSORS = (
+    "timing_fetch_casy",
+    "timing_decode_casy",
+    "payload_size",
+    "record_count",
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -33,8 +49,32 @@ async def async_setup_entry(
         EGDDistribuceCurrentPriceSensor(coordinator, entry),
         EGDDistribuceRemainingTimeSensor(coordinator, entry),
         EGDDistribuceNextChangeSensor(coordinator, entry),
+        # Diagnostika výkonu (ve výchozím stavu vypnuté); stahování a velikost
+        # sdíleného datasetu jsou jen v diagnostice, ne u každé entry
+        EGDDistribuceTimingSensor(
+            coordinator, entry, coordinator.timings, "schedule", "Doba výpočtu rozvrhu"
+        ),
     ]
 
+    # Odstranit senzory datasetu ze starších verzí
+    registry = er.async_get(hass)
+    for unique_id in REMOVED_DATASET_SENSORS:
+        if entity_id := registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{entry.entry_id}_{unique_id}"
+        ):
+            registry.async_remove(entity_id)
+
+    # NT/VT spotřeba a náklady ze zvoleného senzoru výkonu nebo energie
+    if source := entry.options.get(CONF_ENERGY_ENTITY):
+        tracker = EnergyCostTracker(hass, coordinator, entry.entry_id, source)
+        await tracker.async_start()
+        entry.async_on_unload(tracker.async_shutdown)
+        sensors += [
+            EGDDistribuceEnergySensor(tracker, entry, "energy_nt", "Spotřeba NT"),
+            EGDDistribuceEnergySensor(tracker, entry, "energy_vt", "Spotřeba VT"),
+            EGDDistribuceEnergyCostSensor(tracker, entry),
+        ]
+
     async_add_entities(sensors)
 
 
@@ -45,6 +85,8 @@ class EGDDistribuceCurrentPriceSensor(CoordinatorEntity[EGDDistribuceCoordinator
     _attr_device_class = SensorDeviceClass.MONETARY
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = "Kč/kWh"
+    # Průběh tarifu je velký a mění se jen s rozvrhem - neukládat do historie
+    _unrecorded_attributes = frozenset({"HDO_HOURLY"})
 
     def __init__(
         self,
@@ -84,12 +126,14 @@ class EGDDistribuceCurrentPriceSensor(CoordinatorEntity[EGDDistribuceCoordinator
             return {}
         
         is_active = self.coordinator.data.get("is_active", False)
-        return {
+        attributes = {
             "tariff": "Nízký (NT)" if is_active else "Vysoký (VT)",
             "price_nt": self.coordinator.price_nt,
             "price_vt": self.coordinator.price_vt,
-            "hourly_prices": self.coordinator.data.get("hourly_prices", {}),
         }
+        if (hdo_hourly := self.coordinator.data.get("HDO_HOURLY")) is not None:
+            attributes["HDO_HOURLY"] = hdo_hourly
+        return attributes
 
 
 class EGDDistribuceRemainingTimeSensor(CoordinatorEntity[EGDDistribuceCoordinator], SensorEntity):
@@ -168,27 +212,23 @@ class EGDDistribuceNextChangeSensor(CoordinatorEntity[EGDDistribuceCoordinator],
         if self.coordinator.data is None:
             return None
         
-        from datetime import datetime
+        timeline = self.coordinator.data.get("timeline")
+        if timeline is None:
+            return "N/A"
         
-        hdo_times_today = self.coordinator.data.get("hdo_times_today", [])
-        current_time = datetime.now().time()
-        
-        # Find next time slot today
-        for slot in hdo_times_today:
-            try:
-                start_time = datetime.strptime(slot['od'], "%H:%M:%S").time()
-                if current_time < start_time:
-                    return f"{slot['od'].replace(':00', '')} - {slot['do'].replace(':00', '')}"
-            except ValueError:
-                continue
-        
-        # If no more today, show first tomorrow
-        hdo_times_tomorrow = self.coordinator.data.get("hdo_times_tomorrow", [])
-        if hdo_times_tomorrow:
-            first_slot = hdo_times_tomorrow[0]
-            return f"Zítra: {first_slot['od'].replace(':00', '')} - {first_slot['do'].replace(':00', '')}"
+        now = dt_util.now()
+        span = timeline.next_active(now)
+        if span is None:
+            return "Žádný plánovaný"
         
-        return "Žádný plánovaný"
+        start, end = span
+        value = f"{start:%H:%M} - {end:%H:%M}" if end is not None else f"{start:%H:%M} -"
+        days_ahead = (start.date() - now.date()).days
+        if days_ahead == 1:
+            return f"Zítra: {value}"
+        if days_ahead > 1:
+            return f"{start:%d.%m.}: {value}"
+        return value
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -218,3 +258,148 @@ class EGDDistribuceNextChangeSensor(CoordinatorEntity[EGDDistribuceCoordinator],
             "total_slots_today": len(hdo_times_today),
             "total_slots_tomorrow": len(hdo_times_tomorrow),
         }
+
+
+class EGDDistribuceTimingSensor(CoordinatorEntity[EGDDistribuceCoordinator], SensorEntity):
+    """Diagnostic sensor with the last duration of a refresh stage."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:timer-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 1
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: EGDDistribuceCoordinator,
+        entry: ConfigEntry,
+        timings: StageTimings,
+        stage: str,
+        name: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._timings = timings
+        self._stage = stage
+
+        self._attr_unique_id = f"{entry.entry_id}_timing_{stage}"
+        self._attr_name = name
+
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": entry.title,
+            "manufacturer": "EGD Distribuce",
+            "model": "HDO",
+            "entry_type": "service",
+        }
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the last duration in milliseconds."""
+        return self._timings.last(self._stage)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the percentiles of the recent durations."""
+        return self._timings.as_dict().get(self._stage, {})
+
+
+class EGDDistribuceEnergySensor(SensorEntity):
+    """Energy consumed in one tariff, measured by the configured sensor."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_icon = "mdi:lightning-bolt"
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_suggested_display_precision = 2
+
+    def __init__(
+        self,
+        tracker: EnergyCostTracker,
+        entry: ConfigEntry,
+        total: str,
+        name: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self._tracker = tracker
+        self._total = total
+
+        self._attr_unique_id = f"{entry.entry_id}_{total}"
+        self._attr_name = name
+
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": entry.title,
+            "manufacturer": "EGD Distribuce",
+            "model": "HDO",
+            "entry_type": "service",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Update with the totals."""
+        self.async_on_remove(self._tracker.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> float:
+        """Return the energy in kWh."""
+        return round(getattr(self._tracker.meter, self._total), 4)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the source sensor."""
+        return {"source": self._tracker.source}
+
+
+class EGDDistribuceEnergyCostSensor(SensorEntity):
+    """Cost of the energy measured by the configured sensor, NT + VT."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_icon = "mdi:cash"
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_native_unit_of_measurement = "Kč"
+    _attr_suggested_display_precision = 2
+
+    def __init__(
+        self,
+        tracker: EnergyCostTracker,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        self._tracker = tracker
+
+        self._attr_unique_id = f"{entry.entry_id}_energy_cost"
+        self._attr_name = "Náklady na elektřinu"
+
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": entry.title,
+            "manufacturer": "EGD Distribuce",
+            "model": "HDO",
+            "entry_type": "service",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Update with the totals."""
+        self.async_on_remove(self._tracker.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> float:
+        """Return the total cost."""
+        return round(self._tracker.meter.cost, 4)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the cost per tariff."""
+        meter = self._tracker.meter
+        return {
+            "cost_nt": round(meter.cost_nt, 2),
+            "cost_vt": round(meter.cost_vt, 2),
+            "source": self._tracker.source,
+        }
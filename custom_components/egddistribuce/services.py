@@ -0,0 +1,109 @@
+"""Services for EGD Distribuce."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_DEADLINE,
+    ATTR_DURATION,
+    ATTR_POWER,
+    ATTR_SPLIT,
+    DOMAIN,
+    SERVICE_FIND_CHEAPEST_WINDOW,
+)
+from .coordinator import async_get_entity_coordinator
+from .schedule import best_split, best_window
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Required(ATTR_DURATION): vol.All(cv.time_period, cv.positive_timedelta),
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+        vol.Optional(ATTR_SPLIT, default=False): cv.boolean,
+        vol.Optional(ATTR_POWER): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def find_cheapest_window(call: ServiceCall) -> ServiceResponse:
+        """Find when to run an appliance for the duration at the lowest price."""
+        entity_id = call.data[ATTR_ENTITY_ID]
+        coordinator = async_get_entity_coordinator(hass, entity_id)
+        if coordinator is None or coordinator.timeline is None:
+            raise ServiceValidationError(f"No HDO schedule for {entity_id}")
+        timeline = coordinator.timeline
+
+        duration: timedelta = call.data[ATTR_DURATION]
+        # Od další celé minuty; hledá se v UTC, okna se od sebe odečítají
+        now = dt_util.utcnow()
+        start = now.replace(second=0, microsecond=0)
+        if start < now:
+            start += timedelta(minutes=1)
+        # Rozvrh je známý jen do konce horizontu
+        end = dt_util.as_utc(timeline.end)
+        if (deadline := call.data.get(ATTR_DEADLINE)) is not None:
+            if deadline.tzinfo is None:
+                deadline = deadline.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+            end = min(end, dt_util.as_utc(deadline))
+        if duration <= timedelta() or start + duration > end:
+            raise ServiceValidationError(
+                f"{duration} does not fit between now and "
+                f"{dt_util.as_local(end).isoformat()}"
+            )
+
+        spans = [
+            (dt_util.as_utc(begin), dt_util.as_utc(finish))
+            for begin, finish in timeline.active_spans(start, end)
+        ]
+        if call.data[ATTR_SPLIT]:
+            windows, low = best_split(spans, start, end, duration)
+        else:
+            begin, low = best_window(spans, start, end, duration)
+            windows = [(begin, begin + duration)]
+
+        hours_nt = low.total_seconds() / 3600
+        hours_vt = (duration - low).total_seconds() / 3600
+        energy_price = hours_nt * coordinator.price_nt + hours_vt * coordinator.price_vt
+        response = {
+            "start": dt_util.as_local(windows[0][0]).isoformat(),
+            "end": dt_util.as_local(windows[-1][1]).isoformat(),
+            "windows": [
+                {
+                    "start": dt_util.as_local(begin).isoformat(),
+                    "end": dt_util.as_local(finish).isoformat(),
+                }
+                for begin, finish in windows
+            ],
+            "nt_minutes": round(hours_nt * 60),
+            "vt_minutes": round(hours_vt * 60),
+            "average_price": round(energy_price / (hours_nt + hours_vt), 4),
+        }
+        if (power := call.data.get(ATTR_POWER)) is not None:
+            response["cost"] = round(power * energy_price, 2)
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,63 @@
+"""Rolling durations of the refresh stages."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any
+
+# Durations kept per stage for the percentiles
+TIMING_SAMPLES = 100
+
+
+class StageTimings:
+    """Keep the last durations of named stages and summarise them."""
+
+    __slots__ = ("_samples", "_counts")
+
+    def __init__(self) -> None:
+        """Initialize empty timings."""
+        self._samples: dict[str, deque[float]] = {}
+        self._counts: dict[str, int] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Time the block as one run of the stage."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, perf_counter() - start)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add one duration of the stage."""
+        if (samples := self._samples.get(stage)) is None:
+            samples = self._samples[stage] = deque(maxlen=TIMING_SAMPLES)
+        samples.append(seconds * 1000)
+        self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def last(self, stage: str) -> float | None:
+        """Last duration of the stage in milliseconds."""
+        samples = self._samples.get(stage)
+        return samples[-1] if samples else None
+
+    def percentile(self, stage: str, share: float) -> float | None:
+        """Percentile (0-1) of the recent durations in milliseconds."""
+        if not (samples := self._samples.get(stage)):
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Summary of every stage, in milliseconds."""
+        return {
+            stage: {
+                "count": self._counts[stage],
+                "last": round(samples[-1], 3),
+                "p50": round(self.percentile(stage, 0.5), 3),
+                "p95": round(self.percentile(stage, 0.95), 3),
+                "max": round(max(samples), 3),
+            }
+            for stage, samples in self._samples.items()
+        }
@@ -0,0 +1,53 @@
+"""Websocket API for the HDO chart card."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+from .coordinator import async_get_entity_coordinator
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_schedule)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/schedule",
+        vol.Required("entity_id"): cv.entity_id,
+        vol.Optional("version"): str,
+    }
+)
+@callback
+def websocket_schedule(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the schedule of the entry an entity belongs to.
+
+    When the client already has the current `version`, only the version is
+    sent back instead of the whole schedule.
+    """
+    coordinator = async_get_entity_coordinator(hass, msg["entity_id"])
+    if coordinator is None or coordinator.schedule is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.const.ERR_NOT_FOUND,
+            f"No HDO schedule for {msg['entity_id']}",
+        )
+        return
+
+    schedule = coordinator.schedule
+    if msg.get("version") == schedule["version"]:
+        connection.send_result(msg["id"], {"version": schedule["version"]})
+        return
+    connection.send_result(msg["id"], schedule)
@@ -0,0 +1 @@
+"""Tests for the EGD Distribuce integration."""
@@ -0,0 +1,121 @@
+"""Shared payloads and helpers for EGD Distribuce tests."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.egddistribuce.const import (
+    API_BASE_URL,
+    API_HDO_PATH,
+    API_REGION_PATH,
+    DOMAIN,
+)
+
+CASY_URL = f"{API_BASE_URL}{API_HDO_PATH}"
+REGION_URL = f"{API_BASE_URL}{API_REGION_PATH}"
+
+
+def make_record(
+    region: str,
+    code_a: str,
+    code_b: str,
+    code_dp: str,
+    hdo_code: str,
+    slots: list[tuple[str, str]],
+    valid_from: tuple[int, int, int] = (9999, 1, 1),
+    valid_to: tuple[int, int, int] = (9999, 12, 31),
+    days: range = range(1, 8),
+) -> dict[str, Any]:
+    """Return one /casy record with the same slots on the given days."""
+    return {
+        "region": region,
+        "A": code_a,
+        "B": code_b,
+        "DP": code_dp,
+        "kodHdo_A": hdo_code,
+        "od": {"rok": valid_from[0], "mesic": valid_from[1], "den": valid_from[2]},
+        "do": {"rok": valid_to[0], "mesic": valid_to[1], "den": valid_to[2]},
+        "sazby": [
+            {
+                "dny": [
+                    {
+                        "denVTydnu": day,
+                        "casy": [{"od": start, "do": end} for start, end in slots],
+                    }
+                    for day in days
+                ]
+            }
+        ],
+    }
+
+
+# NT 00:00-07:00, 13:00-16:00 and 20:00-24:00 every day
+CASY = [
+    make_record(
+        "Brno",
+        "3",
+        "7",
+        "01",
+        "405",
+        [("00:00:00", "06:59:00"), ("13:00:00", "15:59:00"), ("20:00:00", "23:59:00")],
+    ),
+    make_record("Brno", "3", "7", "02", "406", [("01:00:00", "05:00:00")]),
+    make_record("TOU", "1", "1", "1", "Cd56", [("10:00:00", "13:59:00")]),
+]
+REGION = [{"PSC": "60200", "Region": "Brno"}, {"PSC": "11000", "Region": "Praha"}]
+
+CLASSIC_DATA = {
+    "config_type": "classic",
+    "psc": "60200",
+    "code_a": "3",
+    "code_b": "7",
+    "code_dp": "01",
+    "price_nt": 1.0,
+    "price_vt": 2.0,
+}
+
+
+def classic_entry(**options: Any) -> MockConfigEntry:
+    """Return a classic (A+B+DP) entry for the Brno record above."""
+    return MockConfigEntry(
+        domain=DOMAIN, title="HDO", unique_id="classic", data=CLASSIC_DATA, options=options
+    )
+
+
+def mock_api(aioclient_mock: AiohttpClientMocker, exc: Exception | None = None) -> None:
+    """Serve the payloads above, or fail both endpoints with exc."""
+    if exc is not None:
+        aioclient_mock.get(CASY_URL, exc=exc)
+        aioclient_mock.get(REGION_URL, exc=exc)
+    else:
+        aioclient_mock.get(CASY_URL, json=CASY)
+        aioclient_mock.get(REGION_URL, json=REGION)
+
+
+def url_calls(aioclient_mock: AiohttpClientMocker, url: str) -> int:
+    """Return how many requests went to the URL."""
+    return sum(1 for call in aioclient_mock.mock_calls if str(call[1]) == url)
+
+
+async def setup_integration(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    entry: MockConfigEntry | None = None,
+    exc: Exception | None = None,
+    **options: Any,
+) -> MockConfigEntry:
+    """Set up the entry (a classic one with the options by default).
+
+    The API serves the payloads above, or fails with exc. The caller
+    checks the entry state, setup retries are not an error here.
+    """
+    mock_api(aioclient_mock, exc)
+    if entry is None:
+        entry = classic_entry(**options)
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
@@ -0,0 +1,10 @@
+"""Fixtures for EGD Distribuce tests."""
+import pytest
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load custom_components/egddistribuce in every test."""
+    yield
@@ -0,0 +1,155 @@
+"""Tests for the HDO API client and the streaming /casy decoder."""
+import json
+import random
+
+from aiohttp import hdrs
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.egddistribuce.api import EGDDistribuceApi, JsonArrayStream
+
+from .common import CASY, CASY_URL
+
+LAST_MODIFIED = "Mon, 05 Oct 2026 08:00:00 GMT"
+
+PAYLOADS = [
+    "[]",
+    "[1, 2.5, -3e5]",
+    " [ 0 , -0.25 ,1E-2, 12345678901234567890 ] ",
+    '[true, false, null, "a,]b", "\\"quoted\\"", "P\\u0159\\u00edbram"]',
+    '[{"region": "Brno", "od": {"rok": 9999}, "sazby": [{"dny": []}]}, [1, [2, []]]]',
+    '[{"region": "Ústí nad Labem", "kodHdo_A": "405"},\n {"region": "Třebíč"}]',
+]
+
+
+def _decode(payload: bytes, sizes, keep=None) -> list:
+    stream = JsonArrayStream(keep)
+    pos = 0
+    for size in sizes:
+        if pos >= len(payload):
+            break
+        stream.feed(payload[pos : pos + size])
+        pos += size
+    stream.feed(payload[pos:])
+    return stream.close()
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_byte_by_byte(payload: str) -> None:
+    """Every split point, including inside numbers and UTF-8 sequences."""
+    data = payload.encode()
+    assert _decode(data, [1] * len(data)) == json.loads(payload)
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_random_chunks(payload: str) -> None:
+    """Random chunk sizes decode the same as json.loads."""
+    rnd = random.Random(payload)
+    data = payload.encode()
+    for _ in range(50):
+        sizes = [rnd.randint(1, 5) for _ in range(len(data))]
+        assert _decode(data, sizes) == json.loads(payload)
+
+
+def test_keep_filter() -> None:
+    """Only accepted elements are kept, all are counted."""
+    payload = json.dumps([{"region": r} for r in ("Brno", "TOU", "Brno")]).encode()
+    stream = JsonArrayStream(lambda x: x["region"] == "Brno")
+    for i in range(0, len(payload), 3):
+        stream.feed(payload[i : i + 3])
+    assert stream.close() == [{"region": "Brno"}, {"region": "Brno"}]
+    assert stream.seen == 3
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        "[1, 2",
+        '[{"a": 1}',
+        '{"a": 1}',
+        "[1] 2",
+        "[1 2]",
+        "[2.]",
+        "[1,]",
+        "[,1]",
+        "[1,,2]",
+        "[,]",
+    ],
+)
+def test_invalid(payload: str) -> None:
+    """Truncated or malformed bodies raise on feed or close."""
+    with pytest.raises(json.JSONDecodeError):
+        _decode(payload.encode(), [1] * len(payload))
+
+
+class _Keep:
+    """Record filter counting the decoded records."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, record: dict) -> bool:
+        self.calls += 1
+        return True
+
+
+async def test_not_modified(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker) -> None:
+    """The validators are sent back and a 304 returns the cached data."""
+    api = EGDDistribuceApi(async_get_clientsession(hass))
+    aioclient_mock.get(
+        CASY_URL,
+        json=CASY,
+        headers={hdrs.ETAG: '"v1"', hdrs.LAST_MODIFIED: LAST_MODIFIED},
+    )
+    assert await api.async_get_json(CASY_URL) == (CASY, True)
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(CASY_URL, status=304)
+    assert await api.async_get_json(CASY_URL) == (CASY, False)
+
+    headers = aioclient_mock.mock_calls[0][3]
+    assert headers[hdrs.IF_NONE_MATCH] == '"v1"'
+    assert headers[hdrs.IF_MODIFIED_SINCE] == LAST_MODIFIED
+    assert api.stats.not_modified == 1
+    assert api.stats.unchanged == 0
+
+
+async def test_unchanged_body_is_not_decoded(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Without validators the same body is recognised by its hash alone."""
+    api = EGDDistribuceApi(async_get_clientsession(hass))
+    keep = _Keep()
+    aioclient_mock.get(CASY_URL, json=CASY)
+
+    assert await api.async_get_json(CASY_URL, keep) == (CASY, True)
+    assert keep.calls == len(CASY)
+
+    data, changed = await api.async_get_json(CASY_URL, keep)
+
+    assert not changed
+    assert data == CASY
+    assert keep.calls == len(CASY)
+    assert hdrs.IF_NONE_MATCH not in (aioclient_mock.mock_calls[1][3] or {})
+    assert api.stats.unchanged == 1
+    assert api.stats.not_modified == 0
+
+
+async def test_changed_body_without_validators(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """A different body is decoded after the hash check."""
+    api = EGDDistribuceApi(async_get_clientsession(hass))
+    keep = _Keep()
+    aioclient_mock.get(CASY_URL, json=CASY)
+    await api.async_get_json(CASY_URL, keep)
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(CASY_URL, json=CASY[:1])
+
+    assert await api.async_get_json(CASY_URL, keep) == (CASY[:1], True)
+    assert keep.calls == len(CASY) + 1
+    assert api.stats.unchanged == 0
@@ -0,0 +1,44 @@
+"""Regression limits of the refresh benchmark and the fixture server."""
+import aiohttp
+import pytest
+
+from benchmarks.bench_refresh import LIMITS, measure
+from benchmarks.fixture_server import Faults, FixtureServer, start_server
+from benchmarks.payloads import make_casy, make_region
+from custom_components.egddistribuce.api import EGDDistribuceApi
+
+
+@pytest.mark.parametrize("count", sorted(LIMITS))
+def test_refresh_within_limits(count: int) -> None:
+    """Index build and one refresh of every entry type stay under the limits."""
+    limits = LIMITS[count]
+
+    build, rows = measure(make_casy(count), horizon=2, stages=False)
+
+    assert build < limits.build_ms
+    for row in rows:
+        assert row["refresh"] < limits.refresh_ms, row["entry"]
+        assert row["peak"] < limits.peak_kib, row["entry"]
+
+
+@pytest.mark.usefixtures("socket_enabled")
+@pytest.mark.parametrize("etag", [True, False])
+async def test_fixture_server_not_modified(etag: bool) -> None:
+    """304 to a matching If-None-Match or, without an ETag, If-Modified-Since."""
+    server = FixtureServer(make_casy(10), make_region(), Faults(etag=etag))
+    runner, base_url = await start_server(server)
+    try:
+        async with aiohttp.ClientSession() as session:
+            api = EGDDistribuceApi(session)
+            data, changed = await api.async_get_json(f"{base_url}/casy")
+            assert changed
+            assert await api.async_get_json(f"{base_url}/casy") == (data, False)
+
+            # Nová verze se stejným obsahem: 200, rozpozná se hashem
+            server.bump()
+            assert await api.async_get_json(f"{base_url}/casy") == (data, False)
+    finally:
+        await runner.cleanup()
+
+    assert (server.stats.ok, server.stats.not_modified) == (2, 1)
+    assert (api.stats.not_modified, api.stats.unchanged) == (1, 1)
@@ -0,0 +1,29 @@
+"""Tests for the config flow."""
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.egddistribuce.const import (
+    CONF_CONFIG_TYPE,
+    CONF_HDO_CODE,
+    CONF_HOURLY_FORMAT,
+    CONFIG_TYPE_SMART,
+    DOMAIN,
+    HOURLY_FORMAT_DISABLED,
+)
+
+
+async def test_new_entry_without_hourly_attribute(hass: HomeAssistant) -> None:
+    """New entries leave HDO_HOURLY to the websocket schedule."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_CONFIG_TYPE: CONFIG_TYPE_SMART}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HDO_CODE: "Cd56"}
+    )
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["data"][CONF_HOURLY_FORMAT] == HOURLY_FORMAT_DISABLED
@@ -0,0 +1,144 @@
+"""Tests for the entry coordinator state."""
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.egddistribuce.const import DOMAIN
+
+from .common import setup_integration
+
+
+async def test_remaining_time_across_dst_end(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """00:30 CEST to 07:00 CET on the night clocks go back is 7.5 hours."""
+    await hass.config.async_update(time_zone="Europe/Prague")
+    freezer.move_to(datetime(2026, 10, 24, 22, 30, tzinfo=timezone.utc))
+
+    await setup_integration(hass, aioclient_mock)
+
+    assert hass.states.get("binary_sensor.hdo_hdo_status").state == "on"
+    assert hass.states.get("sensor.hdo_zbyvajici_cas_do_zmeny").state == "7:30"
+
+
+async def test_legacy_hourly_across_dst_end(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """The 15 minute grid has 100 points on the 25 hour day."""
+    await hass.config.async_update(time_zone="Europe/Prague")
+    freezer.move_to(datetime(2026, 10, 24, 22, 30, tzinfo=timezone.utc))
+
+    entry = await setup_integration(hass, aioclient_mock, hourly_format="legacy", horizon_days=1)
+
+    hourly = hass.data[DOMAIN][entry.entry_id].data["HDO_HOURLY"]
+    assert len(hourly) == 100
+    assert "2026-10-25T02:00:00+02:00" in hourly
+    assert "2026-10-25T02:00:00+01:00" in hourly
+
+
+async def test_status_entity_quiet_between_transitions(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Minute ticks update the remaining time sensor, not the status entity."""
+    await hass.config.async_update(time_zone="Europe/Prague")
+    freezer.move_to(datetime(2026, 10, 24, 22, 30, tzinfo=timezone.utc))
+    await setup_integration(hass, aioclient_mock)
+    status = hass.states.get("binary_sensor.hdo_hdo_status")
+    assert "remaining_time" not in status.attributes
+
+    freezer.tick(timedelta(minutes=5))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("binary_sensor.hdo_hdo_status") is status
+    assert hass.states.get("sensor.hdo_zbyvajici_cas_do_zmeny").state == "7:25"
+
+
+async def test_status_flips_at_transition_offline(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """NT ends at 07:00 exactly, from the timeline, with no request."""
+    await hass.config.async_update(time_zone="Europe/Prague")
+    freezer.move_to(datetime(2026, 10, 18, 4, 58, tzinfo=timezone.utc))
+    await setup_integration(hass, aioclient_mock)
+    assert hass.states.get("binary_sensor.hdo_hdo_status").state == "on"
+    calls = aioclient_mock.call_count
+
+    freezer.move_to(datetime(2026, 10, 18, 4, 59, 59, tzinfo=timezone.utc))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get("binary_sensor.hdo_hdo_status").state == "on"
+
+    freezer.move_to(datetime(2026, 10, 18, 5, 0, tzinfo=timezone.utc))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("binary_sensor.hdo_hdo_status").state == "off"
+    assert hass.states.get("sensor.hdo_aktualni_cena").state == "2.0"
+    assert aioclient_mock.call_count == calls
+
+
+async def test_compact_hourly_spans(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """One span per tariff change over the horizon, merged across midnight."""
+    await hass.config.async_update(time_zone="Europe/Prague")
+    freezer.move_to(datetime(2026, 10, 18, 8, tzinfo=timezone.utc))
+
+    entry = await setup_integration(hass, aioclient_mock, hourly_format="compact")
+
+    assert hass.data[DOMAIN][entry.entry_id].data["HDO_HOURLY"] == [
+        ["2026-10-18T00:00:00+02:00", "2026-10-18T07:00:00+02:00", "NT"],
+        ["2026-10-18T07:00:00+02:00", "2026-10-18T13:00:00+02:00", "VT"],
+        ["2026-10-18T13:00:00+02:00", "2026-10-18T16:00:00+02:00", "NT"],
+        ["2026-10-18T16:00:00+02:00", "2026-10-18T20:00:00+02:00", "VT"],
+        ["2026-10-18T20:00:00+02:00", "2026-10-19T07:00:00+02:00", "NT"],
+        ["2026-10-19T07:00:00+02:00", "2026-10-19T13:00:00+02:00", "VT"],
+        ["2026-10-19T13:00:00+02:00", "2026-10-19T16:00:00+02:00", "NT"],
+        ["2026-10-19T16:00:00+02:00", "2026-10-19T20:00:00+02:00", "VT"],
+        ["2026-10-19T20:00:00+02:00", "2026-10-20T00:00:00+02:00", "NT"],
+    ]
+    price = hass.states.get("sensor.hdo_aktualni_cena")
+    assert len(price.attributes["HDO_HOURLY"]) == 9
+
+
+async def test_day_slots_are_memoized(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """On a new day only the day entering the horizon is parsed."""
+    await hass.config.async_update(time_zone="Europe/Prague")
+    freezer.move_to(datetime(2026, 10, 18, 8, tzinfo=timezone.utc))
+    entry = await setup_integration(hass, aioclient_mock, horizon_days=3)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    with patch.object(coordinator, "_parse_day", wraps=coordinator._parse_day) as parse_day:
+        await coordinator.async_refresh()
+        assert parse_day.call_count == 0
+
+        freezer.move_to(datetime(2026, 10, 19, 8, tzinfo=timezone.utc))
+        await coordinator.async_refresh()
+
+    assert [call.args[1] for call in parse_day.call_args_list] == [date(2026, 10, 21)]
+    assert sorted(coordinator._day_slots) == [
+        date(2026, 10, 19),
+        date(2026, 10, 20),
+        date(2026, 10, 21),
+    ]
+    assert len(coordinator.data["HDO_HOURLY"]) == 13
@@ -0,0 +1,38 @@
+"""Tests for the day type calendar."""
+from datetime import date
+
+from custom_components.egddistribuce.daytype import HOLIDAY_DAY_CODE, DayTypeCalendar
+
+
+class _CountingHolidays(set):
+    """Holiday set counting the lookups."""
+
+    lookups = 0
+
+    def __contains__(self, day: object) -> bool:
+        self.lookups += 1
+        return super().__contains__(day)
+
+
+def test_holidays_use_the_sunday_code() -> None:
+    """Czech public holidays are 7, other days their ISO weekday."""
+    calendar = DayTypeCalendar()
+
+    # Den vzniku Československa, středa
+    assert calendar.day_code(date(2026, 10, 28)) == HOLIDAY_DAY_CODE == 7
+    assert calendar.day_code(date(2026, 12, 24)) == 7
+    assert calendar.day_code(date(2026, 10, 27)) == 2
+    assert calendar.day_code(date(2026, 10, 31)) == 6
+    assert calendar.day_code(date(2026, 11, 1)) == 7
+
+
+def test_each_date_is_resolved_once() -> None:
+    """Repeated lookups of a date are served from the memo."""
+    calendar = DayTypeCalendar()
+    holidays = calendar._holidays = _CountingHolidays({date(2026, 10, 28)})
+
+    for _ in range(3):
+        assert calendar.day_code(date(2026, 10, 28)) == 7
+        assert calendar.day_code(date(2026, 10, 29)) == 4
+
+    assert holidays.lookups == 2
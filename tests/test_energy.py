@@ -0,0 +1,216 @@
+"""Tests for the NT/VT energy and cost totals."""
+from datetime import date, datetime, timedelta, timezone
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.egddistribuce.const import DOMAIN, ENERGY_STORAGE_KEY
+from custom_components.egddistribuce.energy import EnergyCostMeter, nt_share
+from custom_components.egddistribuce.schedule import HdoTimeline
+
+from .common import CLASSIC_DATA, setup_integration
+
+ENTRY_ID = "energy_entry"
+STORAGE_KEY = f"{ENERGY_STORAGE_KEY}.{ENTRY_ID}"
+# 18 October 2026 in UTC; the test time zone (US/Pacific) is UTC-7
+DAY = datetime(2026, 10, 18, 7, tzinfo=timezone.utc)
+NT = "sensor.hdo_spotreba_nt"
+VT = "sensor.hdo_spotreba_vt"
+COST = "sensor.hdo_naklady_na_elektrinu"
+
+
+def _at(hours: float) -> datetime:
+    """Local time on the test day (NT 0-7, 13-16 and 20-24)."""
+    return DAY + timedelta(hours=hours)
+
+
+async def _setup(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, source: str
+) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="HDO",
+        unique_id="classic",
+        entry_id=ENTRY_ID,
+        data=CLASSIC_DATA,
+        options={"energy_entity": source},
+    )
+    return await setup_integration(hass, aioclient_mock, entry)
+
+
+def _totals(hass: HomeAssistant) -> tuple[float, float, float]:
+    return tuple(float(hass.states.get(x).state) for x in (NT, VT, COST))
+
+
+async def _sample(hass: HomeAssistant, freezer, when: datetime, value: str, unit: str) -> None:
+    freezer.move_to(when)
+    hass.states.async_set("sensor.meter", value, {"unit_of_measurement": unit})
+    await hass.async_block_till_done()
+
+
+def test_meter_prices_each_tariff() -> None:
+    """Energy is split by the NT share and priced per tariff."""
+    meter = EnergyCostMeter()
+    meter.add(4.0, 0.25, 1.0, 2.0)
+
+    assert (meter.energy_nt, meter.energy_vt) == (1.0, 3.0)
+    assert (meter.cost_nt, meter.cost_vt, meter.cost) == (1.0, 6.0, 7.0)
+
+
+def test_nt_share_is_clipped_to_the_timeline() -> None:
+    """Time before the timeline does not count as its initial state."""
+    tz = dt_util.get_time_zone("Europe/Prague")
+    timeline = HdoTimeline(date(2026, 3, 2), [[(0, 420)]], tz)
+    midnight = datetime(2026, 3, 2, tzinfo=tz)
+
+    assert nt_share(timeline, midnight, midnight + timedelta(hours=14)) == 0.5
+    assert nt_share(timeline, midnight - timedelta(days=2), midnight + timedelta(hours=14)) == 0.5
+    assert nt_share(timeline, midnight + timedelta(hours=3), midnight + timedelta(hours=3)) == 1.0
+
+
+def test_nt_share_across_dst_end() -> None:
+    """00:00-07:00 is 8 real hours on the night clocks go back."""
+    tz = dt_util.get_time_zone("Europe/Prague")
+    timeline = HdoTimeline(date(2026, 10, 25), [[(0, 420)]], tz)
+    midnight = datetime(2026, 10, 25, tzinfo=tz)
+
+    assert nt_share(timeline, midnight, midnight + timedelta(hours=24)) == pytest.approx(8 / 25)
+
+
+async def test_power_is_integrated(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, freezer: FrozenDateTimeFactory
+) -> None:
+    """2 kW held from 06:00 to 08:00 is 2 kWh NT and 2 kWh VT."""
+    freezer.move_to(_at(6))
+    hass.states.async_set("sensor.meter", "2000", {"unit_of_measurement": "W"})
+    await _setup(hass, aioclient_mock, "sensor.meter")
+
+    await _sample(hass, freezer, _at(8), "0", "W")
+
+    assert _totals(hass) == (2.0, 2.0, 6.0)
+    assert hass.states.get(COST).attributes["cost_nt"] == 2.0
+
+
+async def test_meter_reset_and_small_decrease(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, freezer: FrozenDateTimeFactory
+) -> None:
+    """A reset counts the new reading, a small correction is ignored."""
+    freezer.move_to(_at(12))
+    hass.states.async_set("sensor.meter", "12345.0", {"unit_of_measurement": "kWh"})
+    await _setup(hass, aioclient_mock, "sensor.meter")
+
+    # 12-13 VT, 13-14 NT
+    await _sample(hass, freezer, _at(14), "12349.0", "kWh")
+    assert _totals(hass) == (2.0, 2.0, 6.0)
+
+    await _sample(hass, freezer, _at(14.5), "12348.9", "kWh")
+    assert _totals(hass) == (2.0, 2.0, 6.0)
+
+    await _sample(hass, freezer, _at(15), "12349.9", "kWh")
+    assert _totals(hass) == (3.0, 2.0, 7.0)
+
+    # Vynulovaný elektroměr - počítá se nová hodnota
+    await _sample(hass, freezer, _at(15.5), "0.5", "kWh")
+    assert _totals(hass) == (3.5, 2.0, 7.5)
+
+
+async def test_unavailable_meter_keeps_the_baseline(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, freezer: FrozenDateTimeFactory
+) -> None:
+    """An energy meter continues from its last reading after an outage."""
+    freezer.move_to(_at(13))
+    hass.states.async_set("sensor.meter", "100", {"unit_of_measurement": "kWh"})
+    await _setup(hass, aioclient_mock, "sensor.meter")
+
+    await _sample(hass, freezer, _at(14), "unavailable", "kWh")
+    await _sample(hass, freezer, _at(15), "101000", "Wh")
+
+    assert _totals(hass) == (1.0, 0.0, 1.0)
+
+
+async def test_gap_across_restart(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+    hass_storage: dict,
+) -> None:
+    """Consumption while HA was down is split by the known part of the gap."""
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "energy_nt": 10.0,
+            "energy_vt": 20.0,
+            "cost_nt": 10.0,
+            "cost_vt": 40.0,
+            "source": "sensor.meter",
+            "kind": "energy",
+            "last_value": 500.0,
+            # Dva dny před začátkem dnešní časové osy
+            "last_time": (_at(12) - timedelta(days=2)).isoformat(),
+        },
+    }
+    freezer.move_to(_at(12))
+    hass.states.async_set("sensor.meter", "512", {"unit_of_measurement": "kWh"})
+    await _setup(hass, aioclient_mock, "sensor.meter")
+
+    # Známá část mezery je dnes 0-12: 7 h NT, 5 h VT
+    assert _totals(hass) == (17.0, 25.0, 67.0)
+
+
+async def test_power_is_not_integrated_across_restart(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+    hass_storage: dict,
+) -> None:
+    """The last power sample is not held over a restart."""
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "energy_nt": 1.0,
+            "energy_vt": 1.0,
+            "cost_nt": 1.0,
+            "cost_vt": 2.0,
+            "source": "sensor.meter",
+            "kind": "power",
+            "last_value": 3.0,
+            "last_time": (_at(12) - timedelta(hours=5)).isoformat(),
+        },
+    }
+    freezer.move_to(_at(12))
+    hass.states.async_set("sensor.meter", "3000", {"unit_of_measurement": "W"})
+    await _setup(hass, aioclient_mock, "sensor.meter")
+
+    assert _totals(hass) == (1.0, 1.0, 3.0)
+
+    await _sample(hass, freezer, _at(13), "0", "W")
+    assert _totals(hass) == (1.0, 4.0, 9.0)
+
+
+async def test_totals_survive_reload_and_are_removed_with_entry(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+    hass_storage: dict,
+) -> None:
+    """Totals are written on unload and deleted with the entry."""
+    freezer.move_to(_at(6))
+    hass.states.async_set("sensor.meter", "1000", {"unit_of_measurement": "W"})
+    entry = await _setup(hass, aioclient_mock, "sensor.meter")
+    await _sample(hass, freezer, _at(7), "0", "W")
+
+    await hass.config_entries.async_reload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert _totals(hass) == (1.0, 0.0, 1.0)
+    assert hass_storage[STORAGE_KEY]["data"]["energy_nt"] == 1.0
+
+    await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    assert STORAGE_KEY not in hass_storage
@@ -0,0 +1,84 @@
+"""Tests for the HDO record index and the validity index."""
+from datetime import date, timedelta
+
+from custom_components.egddistribuce.index import (
+    HdoRecordIndex,
+    ValidityBoundaries,
+    ValidityIndex,
+)
+from custom_components.egddistribuce.models import HdoRecord
+
+from .common import make_record
+
+SLOTS = [("00:00:00", "06:59:00")]
+RECORDS = [
+    # Každoročně duben-září a říjen-březen (přes Nový rok)
+    make_record("Brno", "1", "1", "01", "1", SLOTS, (9999, 4, 1), (9999, 9, 30)),
+    make_record("Brno", "1", "1", "01", "2", SLOTS, (9999, 10, 1), (9999, 3, 31)),
+    # Konkrétní období, jedno přes přelom roku
+    make_record("Brno", "1", "1", "01", "3", SLOTS, (2026, 2, 10), (2026, 2, 20)),
+    make_record("Brno", "1", "1", "01", "4", SLOTS, (2026, 12, 20), (2027, 1, 10)),
+    make_record("Brno", "1", "1", "01", "5", SLOTS, (2026, 2, 15), (2026, 3, 5)),
+]
+
+
+def _valid_on(record: dict, day: date) -> bool:
+    """Straightforward validity check the index must agree with."""
+    start, end = record["od"], record["do"]
+    if start["rok"] == 9999:
+        first, last = start["mesic"], end["mesic"]
+        if first <= last:
+            return first <= day.month <= last
+        return day.month >= first or day.month <= last
+    end_year = end["rok"] + 1 if end["rok"] < start["rok"] else end["rok"]
+    first = date(start["rok"], start["mesic"], start["den"])
+    last = date(end_year, end["mesic"], end["den"])
+    return first <= day <= last
+
+
+def test_records_on_matches_every_day() -> None:
+    """Every day of two years returns exactly the valid records, in order."""
+    records = [HdoRecord.from_dict(x) for x in RECORDS]
+    index = ValidityIndex(records)
+
+    day = date(2025, 12, 1)
+    while day < date(2027, 12, 31):
+        expected = tuple(
+            record for record, raw in zip(records, RECORDS) if _valid_on(raw, day)
+        )
+        assert index.records_on(day) == expected, day
+        day += timedelta(days=1)
+
+
+def test_invalid_dates_are_skipped() -> None:
+    """A record with an impossible date is left out, not fatal."""
+    broken = make_record("Brno", "1", "1", "01", "9", SLOTS, (2026, 2, 30), (2026, 3, 1))
+    index = ValidityIndex([HdoRecord.from_dict(broken)])
+
+    assert index.records_on(date(2026, 3, 1)) == ()
+
+
+def test_boundaries() -> None:
+    """Month starts of seasons and first / day-after-last of dated records."""
+    boundaries = ValidityBoundaries(RECORDS)
+
+    assert boundaries.next(date(2026, 2, 1)) == date(2026, 2, 10)
+    assert boundaries.next(date(2026, 2, 16)) == date(2026, 2, 21)
+    assert boundaries.previous(date(2026, 2, 16)) == date(2026, 2, 15)
+    assert boundaries.next(date(2026, 6, 1)) == date(2026, 10, 1)
+    assert boundaries.next(date(2026, 12, 25)) == date(2027, 1, 11)
+
+
+def test_record_index_lookups() -> None:
+    """Lookups convert matching records to models, malformed ones are skipped."""
+    records = [
+        make_record("Brno", "3", "7", "01", "405", SLOTS),
+        make_record("Brno", "3", "7", "02", "406", SLOTS),
+        {"region": "Brno", "A": "3", "B": "7", "DP": "1", "kodHdo_A": "407", "od": {}},
+    ]
+    index = HdoRecordIndex(records)
+
+    assert [x.code for x in index.classic("Brno", "3", "7", "1")] == ["405"]
+    assert [x.code for x in index.region_code("Brno", "406")] == ["406"]
+    assert index.code("407") == []
+    assert index.classic("Praha", "3", "7", "01") == []
@@ -0,0 +1,136 @@
+"""Tests for setting up entries from the shared dataset and its snapshot."""
+from datetime import timedelta
+
+import aiohttp
+from freezegun.api import FrozenDateTimeFactory
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.egddistribuce.api import CachedPayload
+from custom_components.egddistribuce.const import DATA_DATASET, DOMAIN, STORAGE_KEY
+from custom_components.egddistribuce.dataset import _encode_snapshot
+from custom_components.egddistribuce.index import RecordFilter
+
+from .common import (
+    CASY,
+    CASY_URL,
+    CLASSIC_DATA,
+    REGION,
+    REGION_URL,
+    mock_api,
+    setup_integration,
+    url_calls,
+)
+
+
+def _snapshot(record_filter: RecordFilter | None = None) -> dict:
+    """Return a stored snapshot of the test payloads."""
+    snapshot = _encode_snapshot(
+        {
+            "casy": CachedPayload(CASY, "casy-digest", record_filter=record_filter),
+            "region": CachedPayload(REGION, "region-digest"),
+        }
+    )
+    snapshot["saved"] = dt_util.utcnow().isoformat()
+    return snapshot
+
+
+async def test_setup_from_snapshot_offline(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, hass_storage: dict
+) -> None:
+    """With the API down the entry starts from the snapshot and recovers later."""
+    hass_storage[STORAGE_KEY] = {"version": 1, "key": STORAGE_KEY, "data": _snapshot()}
+    entry = await setup_integration(hass, aioclient_mock, exc=aiohttp.ClientError())
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("binary_sensor.hdo_hdo_status") is not None
+    assert hass.states.get("sensor.hdo_aktualni_cena").attributes["price_nt"] == 1.0
+
+    # Stažení selhalo - data ze snapshotu zůstávají a brzy se zkusí znovu
+    dataset = hass.data[DOMAIN][DATA_DATASET]
+    assert aioclient_mock.call_count >= 1
+    assert not dataset.last_update_success
+    assert dataset.data == CASY
+    assert dataset.update_interval <= timedelta(minutes=6)
+
+    aioclient_mock.clear_requests()
+    mock_api(aioclient_mock)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=10))
+    await hass.async_block_till_done()
+
+    assert dataset.last_update_success
+    assert dataset.update_interval >= timedelta(hours=1)
+    assert dataset.api.get_cached(CASY_URL).digest != "casy-digest"
+
+
+async def test_setup_without_snapshot_offline(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Without a snapshot the entry is retried until the API answers."""
+    entry = await setup_integration(hass, aioclient_mock, exc=aiohttp.ClientError())
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+
+
+async def test_setup_from_snapshot_downloads_once(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, hass_storage: dict
+) -> None:
+    """The refresh after the snapshot and the first entry share one download."""
+    # Snapshot jiné entry - nová entry potřebuje záznamy svého regionu
+    snapshot = _snapshot(RecordFilter(frozenset({"Praha"})))
+    hass_storage[STORAGE_KEY] = {"version": 1, "key": STORAGE_KEY, "data": snapshot}
+
+    entry = await setup_integration(hass, aioclient_mock)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert url_calls(aioclient_mock, CASY_URL) == 1
+
+
+async def test_entries_share_one_download(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """A second entry of the same region uses the dataset the first fetched."""
+    first = await setup_integration(hass, aioclient_mock)
+    second = MockConfigEntry(
+        domain=DOMAIN,
+        title="HDO 2",
+        unique_id="classic_02",
+        data={**CLASSIC_DATA, "code_dp": "02"},
+    )
+    await setup_integration(hass, aioclient_mock, second)
+
+    assert first.state is ConfigEntryState.LOADED
+    assert second.state is ConfigEntryState.LOADED
+    assert hass.states.get("binary_sensor.hdo_2_hdo_status") is not None
+    assert url_calls(aioclient_mock, CASY_URL) == 1
+
+
+async def test_poll_skips_the_region_table(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, freezer: FrozenDateTimeFactory
+) -> None:
+    """A dataset poll re-validates /casy only, /region once a day."""
+    await setup_integration(hass, aioclient_mock)
+    dataset = hass.data[DOMAIN][DATA_DATASET]
+    aioclient_mock.clear_requests()
+    mock_api(aioclient_mock)
+
+    freezer.tick(dataset.update_interval + timedelta(minutes=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert url_calls(aioclient_mock, CASY_URL) == 1
+    assert url_calls(aioclient_mock, REGION_URL) == 0
+
+    freezer.tick(timedelta(hours=25))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert url_calls(aioclient_mock, CASY_URL) == 2
+    assert url_calls(aioclient_mock, REGION_URL) == 1
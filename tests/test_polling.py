@@ -0,0 +1,66 @@
+"""Tests for the adaptive poll interval."""
+from datetime import timedelta
+import random
+
+from custom_components.egddistribuce.polling import AdaptivePolling
+
+HOUR = timedelta(hours=1)
+
+
+def _polling(jitter: float = 0.0) -> AdaptivePolling:
+    return AdaptivePolling(
+        base=6 * HOUR,
+        maximum=24 * HOUR,
+        boundary=HOUR,
+        window=12 * HOUR,
+        retry=timedelta(minutes=5),
+        jitter=jitter,
+        rnd=random.Random(1),
+    )
+
+
+def test_errors_back_off_up_to_base() -> None:
+    """Retries double from 5 minutes and never exceed the base interval."""
+    polling = _polling()
+
+    intervals = [polling.failed() for _ in range(8)]
+
+    assert intervals[:3] == [timedelta(minutes=5), timedelta(minutes=10), timedelta(minutes=20)]
+    assert intervals[-1] == 6 * HOUR
+    assert polling.succeeded(True) == 6 * HOUR
+    assert polling.failures == 0
+    assert polling.failed() == timedelta(minutes=5)
+
+
+def test_unchanged_payloads_stretch_the_interval() -> None:
+    """Identical payloads double the interval up to the maximum."""
+    polling = _polling()
+
+    assert [polling.succeeded(False) for _ in range(4)] == [
+        12 * HOUR,
+        24 * HOUR,
+        24 * HOUR,
+        24 * HOUR,
+    ]
+    assert polling.succeeded(True) == 6 * HOUR
+
+
+def test_boundaries() -> None:
+    """Near a validity boundary poll hourly, before it cut the wait short."""
+    polling = _polling()
+
+    assert polling.succeeded(True, since_boundary=3 * HOUR) == HOUR
+    assert polling.succeeded(True, until_boundary=10 * HOUR) == HOUR
+    assert polling.succeeded(True, until_boundary=15 * HOUR) == 3 * HOUR
+    assert polling.succeeded(True, until_boundary=12 * HOUR + 20 * timedelta(minutes=1)) == HOUR
+    assert polling.succeeded(True, until_boundary=48 * HOUR) == 6 * HOUR
+
+
+def test_jitter_bounds() -> None:
+    """Jitter spreads every interval by at most the configured share."""
+    polling = _polling(jitter=0.1)
+
+    intervals = {polling.succeeded(True) for _ in range(50)}
+
+    assert len(intervals) > 1
+    assert all(5.4 * HOUR <= x <= 6.6 * HOUR for x in intervals)
@@ -0,0 +1,159 @@
+"""Tests for the compiled HDO timeline."""
+from datetime import date, datetime, timedelta
+import random
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.egddistribuce.schedule import (
+    HdoTimeline,
+    best_split,
+    best_window,
+    elapsed,
+    merge_intervals,
+    parse_minute,
+    slot_interval,
+)
+
+DAY = date(2026, 3, 2)
+MIDNIGHT = datetime(2026, 3, 2)
+
+
+def _at(hours: float, days: int = 0) -> datetime:
+    return MIDNIGHT + timedelta(days=days, hours=hours)
+
+
+def test_slot_interval_closes_at_full_hour() -> None:
+    """'06:59:00' ends at 07:00, '23:59:00' at the end of the day."""
+    assert slot_interval("00:00:00", "06:59:00") == (0, 420)
+    assert slot_interval("20:00:00", "23:59:00") == (1200, 1440)
+    assert slot_interval("10:15:00", "10:45:00") == (615, 645)
+
+
+@pytest.mark.parametrize("value", ["24:00", "12:60", "x"])
+def test_parse_minute_invalid(value: str) -> None:
+    """Out of range or garbled times raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_minute(value)
+
+
+def test_merge_intervals() -> None:
+    """Overlapping and touching intervals merge, empty ones are dropped."""
+    assert merge_intervals([(60, 120), (0, 30), (100, 200), (200, 210), (5, 5)]) == [
+        (0, 30),
+        (60, 210),
+    ]
+
+
+def test_slots_over_midnight_are_one_span() -> None:
+    """20:00-24:00 followed by 00:00-07:00 is a single NT span."""
+    timeline = HdoTimeline(DAY, [[(0, 420), (1200, 1440)], [(0, 420)]])
+
+    assert timeline.initial
+    assert timeline.state_at(_at(3))
+    assert not timeline.state_at(_at(7))
+    assert timeline.state_at(_at(23.5))
+    assert timeline.next_transition(_at(21)) == (_at(7, days=1), False)
+    assert timeline.next_active(_at(8)) == (_at(20), _at(7, days=1))
+    assert list(timeline.iter_transitions(_at(0), _at(24))) == [
+        (_at(7), False),
+        (_at(20), True),
+    ]
+
+
+def test_state_holds_past_the_end() -> None:
+    """Beyond the last day the last state holds, with no more transitions."""
+    timeline = HdoTimeline(DAY, [[(600, 660)]])
+
+    assert not timeline.state_at(_at(30))
+    assert timeline.next_transition(_at(12)) is None
+    assert timeline.next_active(_at(12)) is None
+
+
+def test_active_spans_are_clipped() -> None:
+    """Spans are clipped to the range and agree with state_at."""
+    timeline = HdoTimeline(DAY, [[(0, 420), (780, 960), (1200, 1440)], [(0, 420)]])
+    start, end = _at(5), _at(4, days=1)
+
+    spans = list(timeline.active_spans(start, end))
+
+    assert spans == [(_at(5), _at(7)), (_at(13), _at(16)), (_at(20), _at(4, days=1))]
+    moment = start
+    while moment < end:
+        assert timeline.state_at(moment) == any(a <= moment < b for a, b in spans)
+        moment += timedelta(minutes=15)
+
+
+def test_elapsed_across_dst_end() -> None:
+    """00:30 CEST to 07:00 CET is 7.5 hours, not 6.5 on the wall clock."""
+    prague = ZoneInfo("Europe/Prague")
+    start = datetime(2026, 10, 25, 0, 30, tzinfo=prague)
+    end = datetime(2026, 10, 25, 7, tzinfo=prague)
+
+    assert end - start == timedelta(hours=6, minutes=30)
+    assert elapsed(start, end) == timedelta(hours=7, minutes=30)
+
+
+def _random_timeline(rnd: random.Random) -> HdoTimeline:
+    days = []
+    for _ in range(2):
+        starts = [rnd.randrange(0, 1440) for _ in range(rnd.randint(0, 4))]
+        days.append(merge_intervals((x, min(1440, x + rnd.randint(1, 300))) for x in starts))
+    return HdoTimeline(DAY, days)
+
+
+def _active(spans: list, start: datetime, end: datetime) -> timedelta:
+    return sum(
+        (min(end, b) - max(start, a) for a, b in spans if min(end, b) > max(start, a)),
+        timedelta(),
+    )
+
+
+def test_best_window_matches_brute_force() -> None:
+    """The linear search finds the window with most NT minute by minute."""
+    rnd = random.Random(3)
+    for _ in range(500):
+        timeline = _random_timeline(rnd)
+        start = _at(rnd.randrange(0, 1440) / 60)
+        end = min(timeline.end, start + timedelta(minutes=rnd.randrange(1, 1800)))
+        minutes = int((end - start).total_seconds() // 60)
+        duration = timedelta(minutes=rnd.randint(1, minutes))
+        spans = list(timeline.active_spans(start, end))
+
+        begin, active = best_window(spans, start, end, duration)
+
+        best = max(
+            _active(spans, start + timedelta(minutes=k), start + timedelta(minutes=k) + duration)
+            for k in range(int((end - start - duration).total_seconds() // 60) + 1)
+        )
+        assert active == best == _active(spans, begin, begin + duration)
+        assert start <= begin and begin + duration <= end
+
+
+def test_best_split_covers_duration() -> None:
+    """Split windows cover the duration with all the NT time available."""
+    rnd = random.Random(4)
+    for _ in range(500):
+        timeline = _random_timeline(rnd)
+        start = _at(rnd.randrange(0, 1440) / 60)
+        end = min(timeline.end, start + timedelta(minutes=rnd.randrange(1, 1800)))
+        minutes = int((end - start).total_seconds() // 60)
+        duration = timedelta(minutes=rnd.randint(1, minutes))
+        spans = list(timeline.active_spans(start, end))
+
+        windows, active = best_split(spans, start, end, duration)
+
+        assert sum((b - a for a, b in windows), timedelta()) == duration
+        assert active == min(duration, _active(spans, start, end))
+        assert active == sum((_active(spans, a, b) for a, b in windows), timedelta())
+        assert all(start <= a < b <= end for a, b in windows)
+        assert all(windows[i][1] < windows[i + 1][0] for i in range(len(windows) - 1))
+
+
+def test_best_window_prefers_earliest() -> None:
+    """Of equally good windows the earliest wins."""
+    timeline = HdoTimeline(DAY, [[(0, 420), (780, 960)]])
+    spans = list(timeline.active_spans(_at(5), _at(24)))
+
+    assert best_window(spans, _at(5), _at(24), timedelta(hours=2)) == (_at(5), timedelta(hours=2))
+    assert best_window(spans, _at(6), _at(24), timedelta(hours=3)) == (_at(13), timedelta(hours=3))
@@ -0,0 +1,31 @@
+"""Tests for the sensor platform."""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.egddistribuce.const import DOMAIN
+
+from .common import classic_entry, setup_integration
+
+
+async def test_dataset_sensors_not_per_entry(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    entity_registry: er.EntityRegistry,
+) -> None:
+    """Dataset diagnostics stay out of the entries, old ones are removed."""
+    entry = classic_entry()
+    stale = entity_registry.async_get_or_create(
+        "sensor", DOMAIN, f"{entry.entry_id}_payload_size"
+    )
+
+    await setup_integration(hass, aioclient_mock, entry)
+
+    unique_ids = {
+        entity.unique_id
+        for entity in er.async_entries_for_config_entry(entity_registry, entry.entry_id)
+    }
+    assert f"{entry.entry_id}_timing_schedule" in unique_ids
+    assert f"{entry.entry_id}_timing_fetch_casy" not in unique_ids
+    assert f"{entry.entry_id}_record_count" not in unique_ids
+    assert entity_registry.async_get(stale.entity_id) is None
@@ -0,0 +1,88 @@
+"""Tests for the find_cheapest_window service."""
+from datetime import datetime, timezone
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.egddistribuce.const import DOMAIN, SERVICE_FIND_CHEAPEST_WINDOW
+
+from .common import setup_integration
+
+ENTITY_ID = "binary_sensor.hdo_hdo_status"
+
+
+@pytest.fixture
+async def setup_entry(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, freezer: FrozenDateTimeFactory
+) -> None:
+    """Set up the Brno entry at 05:00:30.5 on 18 October 2026, Prague time."""
+    await hass.config.async_update(time_zone="Europe/Prague")
+    freezer.move_to(datetime(2026, 10, 18, 3, 0, 30, 500000, tzinfo=timezone.utc))
+    await setup_integration(hass, aioclient_mock)
+
+
+async def _call(hass: HomeAssistant, **data) -> dict:
+    return await hass.services.async_call(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        {"entity_id": ENTITY_ID, **data},
+        blocking=True,
+        return_response=True,
+    )
+
+
+@pytest.mark.usefixtures("setup_entry")
+async def test_contiguous_window(hass: HomeAssistant) -> None:
+    """A 4 hour run fits whole into the evening NT."""
+    response = await _call(hass, duration="04:00:00", power=2)
+
+    assert response == {
+        "start": "2026-10-18T20:00:00+02:00",
+        "end": "2026-10-19T00:00:00+02:00",
+        "windows": [{"start": "2026-10-18T20:00:00+02:00", "end": "2026-10-19T00:00:00+02:00"}],
+        "nt_minutes": 240,
+        "vt_minutes": 0,
+        "average_price": 1.0,
+        "cost": 8.0,
+    }
+
+
+@pytest.mark.usefixtures("setup_entry")
+async def test_split_windows_start_on_whole_minutes(hass: HomeAssistant) -> None:
+    """Windows start at the next whole minute, no sub-second leftovers."""
+    response = await _call(
+        hass, duration={"hours": 6}, split=True, deadline="2026-10-18 19:00:00"
+    )
+
+    assert response["windows"] == [
+        {"start": "2026-10-18T05:01:00+02:00", "end": "2026-10-18T08:01:00+02:00"},
+        {"start": "2026-10-18T13:00:00+02:00", "end": "2026-10-18T16:00:00+02:00"},
+    ]
+    assert response["nt_minutes"] == 299
+    assert response["vt_minutes"] == 61
+
+
+@pytest.mark.usefixtures("setup_entry")
+async def test_window_too_long(hass: HomeAssistant) -> None:
+    """A duration past the known schedule is rejected."""
+    with pytest.raises(ServiceValidationError):
+        await _call(hass, duration="99:00:00")
+
+
+async def test_window_across_dst_end(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, freezer: FrozenDateTimeFactory
+) -> None:
+    """NT from 00:30 CEST to 07:00 CET is 7.5 real hours."""
+    await hass.config.async_update(time_zone="Europe/Prague")
+    freezer.move_to(datetime(2026, 10, 24, 22, 30, tzinfo=timezone.utc))
+    await setup_integration(hass, aioclient_mock)
+
+    response = await _call(hass, duration="07:30:00")
+
+    assert response["start"] == "2026-10-25T00:30:00+02:00"
+    assert response["end"] == "2026-10-25T07:00:00+01:00"
+    assert response["nt_minutes"] == 450
@@ -0,0 +1,57 @@
+"""Tests for the chart card websocket command."""
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+
+from .common import setup_integration
+
+ENTITY_ID = "binary_sensor.hdo_hdo_status"
+
+
+async def test_schedule_version(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """The current version gets only the version back, a stale one the spans."""
+    await setup_integration(hass, aioclient_mock)
+    version = hass.states.get(ENTITY_ID).attributes["schedule_version"]
+    client = await hass_ws_client(hass)
+
+    await client.send_json_auto_id({"type": "egddistribuce/schedule", "entity_id": ENTITY_ID})
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"]["version"] == version
+    spans = response["result"]["spans"]
+    assert spans[0][2] == "NT"
+
+    await client.send_json_auto_id(
+        {"type": "egddistribuce/schedule", "entity_id": ENTITY_ID, "version": version}
+    )
+    response = await client.receive_json()
+    assert response["result"] == {"version": version}
+
+    await client.send_json_auto_id(
+        {"type": "egddistribuce/schedule", "entity_id": ENTITY_ID, "version": "stale"}
+    )
+    response = await client.receive_json()
+    assert response["result"]["version"] == version
+    assert response["result"]["spans"] == spans
+
+
+async def test_schedule_unknown_entity(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    hass_ws_client: WebSocketGenerator,
+) -> None:
+    """Entities without a schedule get not_found."""
+    await setup_integration(hass, aioclient_mock)
+    client = await hass_ws_client(hass)
+
+    await client.send_json_auto_id(
+        {"type": "egddistribuce/schedule", "entity_id": "sensor.unknown"}
+    )
+    response = await client.receive_json()
+
+    assert not response["success"]
+    assert response["error"]["code"] == "not_found"